@@ -1,32 +1,221 @@
 import os
 import json
-import qrcode
+import atexit
+import hmac
+import time
+import itertools
+import zlib
+import click
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
 from io import BytesIO, StringIO
 import csv
-from cs50 import SQL
 from werkzeug.utils import secure_filename
-from flask import Flask, flash, redirect, render_template, request, session, send_file, url_for
-from flask_session import Session
-from werkzeug.security import check_password_hash, generate_password_hash
+from flask import Flask, flash, g, has_request_context, jsonify, redirect, render_template, request, session, send_file, stream_with_context, url_for
 from functools import wraps
+import archive
+import query_plans
+from attendance_writer import AttendanceWriter
+from cache import LRUCache
+from catalog import SubjectCatalog
+from database import Database
 from helpers import apology
+from metrics import Metrics
+from passwords import HasherBusy, PasswordHasher
+from qr_images import MIMETYPES, QRImageCache
+from qr_tokens import QRTokenSigner, is_token
+from schema import ensure_schema, rebuild_summaries
+from session_store import init_session
+from timetable import parse_timetable, stream_qr_zip
 
 # Configure application
 app = Flask(__name__)
-app.config["SESSION_PERMANENT"] = False
-app.config["SESSION_TYPE"] = "filesystem"
-Session(app)
 
-# Configure CS50 Library to use SQLite database
-db = SQL("sqlite:///class-attendance.db")
+# Debugging output goes through the app logger; set LOG_LEVEL=DEBUG to see it
+app.logger.setLevel(os.environ.get("LOG_LEVEL", "WARNING"))
+
+# Session backend: "cookie" keeps the small session payload in a cookie signed
+# with SECRET_KEY, "sqlite" keeps it server-side in a single self-pruning SQLite
+# file. Cookies need a fixed SECRET_KEY shared by every worker (a random one
+# would log everyone out on restart), so without one the default is "sqlite".
+app.config["SECRET_KEY"] = os.environ.get("SECRET_KEY")
+app.config["SESSION_BACKEND"] = os.environ.get("SESSION_BACKEND", "cookie" if app.config["SECRET_KEY"] else "sqlite")
+app.config["SESSION_SQLITE_PATH"] = "flask_session.db"
+app.config["SESSION_PRUNE_INTERVAL"] = 300
+if app.config["SESSION_BACKEND"] == "cookie" and not app.config["SECRET_KEY"]:
+    raise RuntimeError("SESSION_BACKEND=cookie requires SECRET_KEY to be set")
+init_session(app)
+
+# Configure the data layer to use the SQLite database
+DATABASE = "class-attendance.db"
+db = Database(DATABASE)
+ensure_schema(db)
+
+# Request and query timings per route, served in Prometheus text format at /metrics
+# (set METRICS_TOKEN to require an "Authorization: Bearer <token>" header)
+app.config["SLOW_QUERY_SECONDS"] = float(os.environ.get("SLOW_QUERY_SECONDS", 0.1))
+app.config["SLOW_QUERY_SAMPLES"] = 50
+app.config["METRICS_TOKEN"] = os.environ.get("METRICS_TOKEN")
+metrics = Metrics(
+    slow_query_seconds=app.config["SLOW_QUERY_SECONDS"],
+    slow_query_samples=app.config["SLOW_QUERY_SAMPLES"],
+)
+
+
+def route_label():
+    """Route pattern of the current request, e.g. /qr/<int:session_id>."""
+    if not has_request_context():
+        return "-"
+    return request.url_rule.rule if request.url_rule else "unmatched"
+
+
+db.on_query = lambda sql, seconds: metrics.observe_query(route_label(), sql, seconds)
+
+# Closed terms are moved to one SQLite file per term under ARCHIVE_DIR by
+# "flask archive-terms"; exports attach them only when their range needs them
+app.config["ARCHIVE_DIR"] = os.environ.get("ARCHIVE_DIR", "archive")
+
+# Cached subject catalog; sessions refer to subjects by integer id
+subject_catalog = SubjectCatalog(db)
+
+# Cache of raw QR payload -> sessions.id so repeated scans skip the lookup query
+app.config["SESSION_CACHE_SIZE"] = 4096
+app.config["SESSION_CACHE_TTL"] = 300
+session_cache = LRUCache(maxsize=app.config["SESSION_CACHE_SIZE"], ttl=app.config["SESSION_CACHE_TTL"])
+
+# Students already marked, per recently scanned session, so rescans are answered
+# without touching SQLite (the unique index on attendance is the real guard)
+app.config["SCAN_DEDUP_SESSIONS"] = 256
+marked_students = LRUCache(maxsize=app.config["SCAN_DEDUP_SESSIONS"])
+
+
+def already_marked(session_id, user_id):
+    marked = marked_students.get(session_id)
+    return marked is not None and user_id in marked
+
+
+def remember_marked(session_id, user_id):
+    marked = marked_students.get(session_id)
+    if marked is None:
+        marked = set()
+        marked_students.set(session_id, marked)
+    marked.add(user_id)
+
+
+# Rendered QR images, cached by payload and output options (QR_CACHE_DIR adds a disk tier)
+app.config["QR_CACHE_SIZE"] = 256
+app.config["QR_CACHE_DIR"] = os.environ.get("QR_CACHE_DIR")
+qr_cache = QRImageCache(maxsize=app.config["QR_CACHE_SIZE"], directory=app.config["QR_CACHE_DIR"])
+
+# Signed QR tokens: with QR_TOKENS on, new QR codes carry a short signed session
+# id instead of the plain session fields; legacy payloads still scan. With
+# QR_TOKEN_ROTATE set, the token for a session changes every that many seconds
+# and each one stays valid for QR_TOKEN_TTL seconds from the start of its window.
+# Without rotation a token also stays valid until the end of its session's date,
+# so a term's timetable imported in advance scans on the day of each session.
+# QR_TOKEN_SECRET must be set, the same for every worker and across restarts, or
+# printed codes stop scanning; with QR_TOKENS off and no secret, no token verifies.
+app.config["QR_TOKENS"] = os.environ.get("QR_TOKENS") == "1"
+app.config["QR_TOKEN_SECRET"] = os.environ.get("QR_TOKEN_SECRET")
+if app.config["QR_TOKENS"] and not app.config["QR_TOKEN_SECRET"]:
+    raise RuntimeError("QR_TOKENS=1 requires QR_TOKEN_SECRET to be set")
+app.config["QR_TOKEN_TTL"] = int(os.environ.get("QR_TOKEN_TTL", 86400))
+app.config["QR_TOKEN_ROTATE"] = int(os.environ.get("QR_TOKEN_ROTATE", 0))
+qr_signer = QRTokenSigner(
+    app.config["QR_TOKEN_SECRET"] or os.urandom(32),
+    ttl=app.config["QR_TOKEN_TTL"],
+    rotate=app.config["QR_TOKEN_ROTATE"],
+)
+
+# Password hashing runs in a bounded process pool so a login storm cannot tie up
+# every request worker; logins wait up to PASSWORD_HASH_WAIT seconds for one of
+# PASSWORD_HASH_MAX_PENDING slots before getting a 503. Hashes made under an
+# older PASSWORD_HASH_METHOD are upgraded on the user's next login.
+app.config["PASSWORD_HASH_METHOD"] = os.environ.get("PASSWORD_HASH_METHOD", "pbkdf2:sha256:600000")
+app.config["PASSWORD_HASH_WORKERS"] = int(os.environ.get("PASSWORD_HASH_WORKERS", os.cpu_count()))
+app.config["PASSWORD_HASH_MAX_PENDING"] = 64
+app.config["PASSWORD_HASH_WAIT"] = 5
+password_hasher = PasswordHasher(
+    method=app.config["PASSWORD_HASH_METHOD"],
+    workers=app.config["PASSWORD_HASH_WORKERS"],
+    max_pending=app.config["PASSWORD_HASH_MAX_PENDING"],
+    wait=app.config["PASSWORD_HASH_WAIT"],
+)
+atexit.register(password_hasher.shutdown)
+
+# Bulk timetable import: row limit and the process pool that renders its QR codes
+app.config["TIMETABLE_MAX_ROWS"] = 5000
+app.config["QR_RENDER_WORKERS"] = os.cpu_count()
+qr_render_pool = None
+
+# Keyset pagination on the admin dashboard
+app.config["ADMIN_PAGE_SIZE"] = 50
+app.config["ADMIN_PAGE_SIZE_MAX"] = 500
+
+# Rows fetched per round trip when streaming CSV exports
+app.config["EXPORT_CHUNK_SIZE"] = 500
+
+# Largest number of scans a kiosk may flush in one /scan_qr/batch request
+app.config["SCAN_BATCH_LIMIT"] = 1000
+
+# Optional write-behind mode: /scan_qr acknowledges once the scan is queued and a
+# background thread group-commits the queue (enable with ATTENDANCE_WRITE_BEHIND=1)
+app.config["ATTENDANCE_WRITE_BEHIND"] = os.environ.get("ATTENDANCE_WRITE_BEHIND") == "1"
+app.config["WRITE_BEHIND_QUEUE_SIZE"] = 10000
+app.config["WRITE_BEHIND_BATCH_SIZE"] = 200
+app.config["WRITE_BEHIND_FLUSH_INTERVAL"] = 0.05
+attendance_writer = None
+if app.config["ATTENDANCE_WRITE_BEHIND"]:
+    attendance_writer = AttendanceWriter(
+        DATABASE,
+        max_queue=app.config["WRITE_BEHIND_QUEUE_SIZE"],
+        batch_size=app.config["WRITE_BEHIND_BATCH_SIZE"],
+        flush_interval=app.config["WRITE_BEHIND_FLUSH_INTERVAL"],
+    )
+    attendance_writer.start()
+    atexit.register(attendance_writer.stop)
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
 
 @app.after_request
 def after_request(response):
-    response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
+    # Responses with an ETag may be stored, but must be revalidated on every use
+    if "ETag" in response.headers:
+        response.headers["Cache-Control"] = "no-cache"
+    else:
+        response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
     response.headers["Expires"] = 0
     response.headers["Pragma"] = "no-cache"
+    g.response_status = response.status_code
     return response
 
+
+@app.teardown_request
+def record_request(exception):
+    # Runs once any streamed body has been sent, so exports are timed in full
+    started = g.pop("request_started", None)
+    if started is None:
+        return
+    status = 500 if exception is not None else g.get("response_status", 500)
+    metrics.observe_request(route_label(), request.method, status, time.perf_counter() - started)
+
+
+@app.teardown_request
+def detach_archives(exception):
+    # Archives attached for this request's reads are released with it
+    db.detach_all()
+
+
+@app.route("/metrics")
+def metrics_endpoint():
+    token = app.config["METRICS_TOKEN"]
+    if token and not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        return app.response_class("Forbidden\n", status=403, mimetype="text/plain")
+    return app.response_class(metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
 def login_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
@@ -35,6 +224,11 @@ def login_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+def busy():
+    """Apology for when the password hashing pool is saturated."""
+    return render_template("apology.html", message="Too many logins right now, please try again", code=503), 503, {"Retry-After": "1"}
+
+
 def admin_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
@@ -96,8 +290,15 @@ def login():
         rows = db.execute("SELECT * FROM users WHERE email = ?", email)
 
         # Verify user exists and password is correct
-        if len(rows) != 1 or not check_password_hash(rows[0]["hash"], password):
-            return render_template("apology.html", message="Invalid email and/or password", code=400)
+        try:
+            if len(rows) != 1 or not password_hasher.verify(rows[0]["hash"], password):
+                return render_template("apology.html", message="Invalid email and/or password", code=400)
+
+            # Upgrade the stored hash if the hashing policy changed since it was made
+            if password_hasher.needs_rehash(rows[0]["hash"]):
+                db.execute("UPDATE users SET hash = ? WHERE id = ?", password_hasher.hash(password), rows[0]["id"])
+        except HasherBusy:
+            return busy()
 
         # Log the user in
         session["user_id"] = rows[0]["id"]
@@ -160,7 +361,10 @@ def register():
             return redirect("/register")
 
         # Hash password
-        hashh = generate_password_hash(password)
+        try:
+            hashh = password_hasher.hash(password)
+        except HasherBusy:
+            return busy()
 
         # Insert new user into the database
         user_id = db.execute("""
@@ -177,28 +381,120 @@ def register():
     return render_template("register.html")
 
 
+def page_args():
+    """Read the keyset cursor ("date|id") and page size from the query string."""
+    limit = request.args.get("limit", type=int) or app.config["ADMIN_PAGE_SIZE"]
+    limit = min(max(limit, 1), app.config["ADMIN_PAGE_SIZE_MAX"])
+    after = request.args.get("after")
+    if after:
+        date, _, row_id = after.rpartition("|")
+        if date and row_id.isdigit():
+            return (date, int(row_id)), limit
+    return None, limit
+
+
+def next_cursor(rows, limit, date_key):
+    """Trim the look-ahead row and return (rows, cursor for the following page)."""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, f"{rows[-1][date_key]}|{rows[-1]['id']}"
+
+
+def sessions_page_query(created_by, after, limit):
+    """SQL and arguments for a page of an admin's sessions, newest first, keyed on (date, id)."""
+    keyset = "AND (sessions.date, sessions.id) < (?, ?)" if after else ""
+    return f"""
+        SELECT sessions.id, sessions.date, sessions.semester, sessions.slot, subjects.name AS subject, sessions.attendance_type,
+               COALESCE((SELECT headcount FROM summary_session_headcount WHERE session_id = sessions.id), 0) AS headcount
+        FROM sessions
+        JOIN subjects ON subjects.id = sessions.subject_id
+        WHERE sessions.created_by = ? {keyset}
+        ORDER BY sessions.date DESC, sessions.id DESC
+        LIMIT ?
+    """, (created_by, *(after or ()), limit + 1)
+
+
+def attendance_page_query(after, limit):
+    """SQL and arguments for a page of attendance, most recently marked first, keyed on (marked_on, id)."""
+    # Ordering by day first lets idx_attendance_day deliver the rows in order
+    keyset = "WHERE (attendance.day, attendance.marked_on, attendance.id) < (DATE(?), ?, ?)" if after else ""
+    args = (after[0], *after) if after else ()
+    return f"""
+        SELECT attendance.id, users.username, attendance.marked_on, sessions.date, subjects.name AS subject, sessions.attendance_type
+        FROM attendance
+        JOIN users ON attendance.user_id = users.id
+        JOIN sessions ON attendance.session_id = sessions.id
+        JOIN subjects ON subjects.id = sessions.subject_id
+        {keyset}
+        ORDER BY attendance.day DESC, attendance.marked_on DESC, attendance.id DESC
+        LIMIT ?
+    """, (*args, limit + 1)
+
+
+def sessions_page(after, limit):
+    sql, args = sessions_page_query(session["user_id"], after, limit)
+    return next_cursor(db.execute(sql, *args), limit, "date")
+
+
+def attendance_page(after, limit):
+    sql, args = attendance_page_query(after, limit)
+    return next_cursor(db.execute(sql, *args), limit, "marked_on")
+
+
 @app.route("/admins")
 @login_required
 @admin_required
 def admins():
-    # Fetch all sessions created by the admin
-    sessions = db.execute("""
-        SELECT id, date, semester, slot, subject, attendance_type
-        FROM sessions
-        WHERE created_by = ?
-        ORDER BY date DESC
-    """, session["user_id"])
+    # Only the first page of each list is rendered; the rest loads from the JSON endpoints
+    _, limit = page_args()
+    sessions, next_sessions = sessions_page(None, limit)
+    attendance, next_attendance = attendance_page(None, limit)
+
+    return render_template("admins.html", sessions=sessions, attendance=attendance,
+                           next_sessions=next_sessions, next_attendance=next_attendance, limit=limit)
+
+
+@app.route("/admins/sessions")
+@login_required
+@admin_required
+def admins_sessions():
+    rows, cursor = sessions_page(*page_args())
+    return jsonify({"rows": rows, "next": cursor})
 
-    # Fetch all attendance records for review
-    attendance = db.execute("""
-        SELECT attendance.id, users.username, sessions.date, sessions.subject, sessions.attendance_type
-        FROM attendance
-        JOIN users ON attendance.user_id = users.id
-        JOIN sessions ON attendance.session_id = sessions.id
-        ORDER BY sessions.date DESC
-    """)
 
-    return render_template("admins.html", sessions=sessions, attendance=attendance)
+@app.route("/admins/attendance")
+@login_required
+@admin_required
+def admins_attendance():
+    rows, cursor = attendance_page(*page_args())
+    return jsonify({"rows": rows, "next": cursor})
+
+
+@app.route("/admins/cache_stats")
+@login_required
+@admin_required
+def cache_stats():
+    # Hit/miss counters for the QR payload -> session cache
+    return jsonify(session_cache.stats())
+
+
+@app.route("/admins/hasher_stats")
+@login_required
+@admin_required
+def hasher_stats():
+    # Hashing policy, pool occupancy and turned-away logins
+    return jsonify(password_hasher.stats())
+
+
+@app.route("/admins/writer_stats")
+@login_required
+@admin_required
+def writer_stats():
+    # Queue depth and flush latency of the write-behind attendance writer
+    if attendance_writer is None:
+        return jsonify({"running": False})
+    return jsonify(attendance_writer.stats())
 
 
 @app.route('/profile', methods=['GET', 'POST'])
@@ -239,30 +535,48 @@ def profile():
 
 
 
+# Every scan of one subject's sessions
+SUBJECT_ATTENDANCE_SQL = """
+    SELECT users.username, sessions.date, sessions.slot, attendance.marked_on
+    FROM attendance
+    JOIN users ON attendance.user_id = users.id
+    JOIN sessions ON attendance.session_id = sessions.id
+    WHERE sessions.subject_id = ?
+"""
+
+
 @app.route("/manage_attendance", methods=["GET", "POST"])
 @login_required
 def manage_attendance():
-    # Get all unique subjects from the database
-    subjects = db.execute("SELECT DISTINCT subject FROM sessions")
+    # Get all subjects from the cached catalog
+    subjects = subject_catalog.all()
 
     if request.method == "POST":
         # Get the selected subject from the form
-        selected_subject = request.form.get("subject")
+        subject_id = request.form.get("subject", type=int)
+        selected_subject = subject_catalog.name_for(subject_id)
 
         if not selected_subject:
             flash("Please select a subject.", "danger")
             return redirect("/manage_attendance")
 
+        # Per-student attendance percentages, read straight from the summary tables
+        student_summary = db.execute("""
+            SELECT users.username, summary.attended, totals.sessions,
+                   ROUND(100.0 * summary.attended / totals.sessions, 1) AS percentage
+            FROM summary_student_subject AS summary
+            JOIN summary_subject_sessions AS totals ON totals.subject_id = summary.subject_id
+            JOIN users ON users.id = summary.user_id
+            WHERE summary.subject_id = ? AND summary.attended > 0
+            ORDER BY percentage DESC, users.username
+        """, subject_id)
+
         # Fetch attendance data for the selected subject
-        attendance_data = db.execute("""
-            SELECT users.username, sessions.date, sessions.slot, attendance.marked_on
-            FROM attendance
-            JOIN users ON attendance.user_id = users.id
-            JOIN sessions ON attendance.session_id = sessions.id
-            WHERE sessions.subject = ?
-        """, selected_subject)
+        attendance_data = db.execute(SUBJECT_ATTENDANCE_SQL, subject_id)
 
-        return render_template("manage_attendance.html", subjects=subjects, attendance_data=attendance_data, selected_subject=selected_subject)
+        return render_template("manage_attendance.html", subjects=subjects, attendance_data=attendance_data,
+                               student_summary=student_summary, selected_subject=selected_subject,
+                               selected_subject_id=subject_id)
 
     return render_template("manage_attendance.html", subjects=subjects)
 
@@ -273,52 +587,162 @@ def manage_attendance():
 
 
 
+def qr_options(values):
+    """Read the QR output format and box size from request values."""
+    fmt = (values.get("format") or "png").lower()
+    if fmt not in MIMETYPES:
+        fmt = "png"
+    try:
+        box_size = min(max(int(values.get("box_size") or 10), 1), 40)
+    except ValueError:
+        box_size = 10
+    return fmt, box_size
+
+
+def qr_payload(session_id, date, semester, slot, subject, attendance_type):
+    """Return the QR payload for a session: a signed token, or the legacy comma-separated fields."""
+    if app.config["QR_TOKENS"]:
+        # Valid at least through the end of the session's day, however early it is printed
+        try:
+            until = (datetime.fromisoformat(date) + timedelta(days=1)).timestamp()
+        except (TypeError, ValueError):
+            until = None
+        return qr_signer.issue(session_id, until=until)
+    return f"{date},{semester},{slot},{subject},{attendance_type}"
+
+
 @app.route("/generate_qr", methods=["GET", "POST"])
 @login_required
 @admin_required  # Ensure that only admins can access this route
 def generate_qr():
-    # Enable foreign key enforcement
-    db.execute("PRAGMA foreign_keys = ON;")
+    if request.method == "POST":
+        date = request.form.get("date")
+        semester = request.form.get("semester")
+        slot = request.form.get("slot")
+        subject = request.form.get("subject")
+        attendance_type = request.form.get("attendance_type")
 
-    try:
-        if request.method == "POST":
-            date = request.form.get("date")
-            semester = request.form.get("semester")
-            slot = request.form.get("slot")
-            subject = request.form.get("subject")
-            attendance_type = request.form.get("attendance_type")
-
-            # Validate the form fields
-            if not date or not semester or not slot or not subject or not attendance_type:
-                flash("All fields are required!", "danger")
-                return redirect("/generate_qr")
-
-            # Insert session into the sessions table with a default created_by value (e.g., 0)
-            session_id = db.execute("""
-                INSERT INTO sessions (date, semester, slot, subject, attendance_type, created_by)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, date, semester, slot, subject, attendance_type, 1)  # Using 0 as the default value for created_by
-
-            # Generate QR code with session details
-            data = f"{date},{semester},{slot},{subject},{attendance_type}"
-            qr = qrcode.QRCode()
-            qr.add_data(data)
-            qr.make(fit=True)
-            img = qr.make_image(fill_color="black", back_color="white")
-            buffer = BytesIO()
-            img.save(buffer)
-            buffer.seek(0)
-
-            # Return the generated QR code as an image file
-            return send_file(buffer, mimetype="image/png", as_attachment=True, download_name="attendance_qr.png")
-
-    finally:
-        # Disable foreign key enforcement
-        db.execute("PRAGMA foreign_keys = OFF;")
+        # Validate the form fields
+        if not date or not semester or not slot or not subject or not attendance_type:
+            flash("All fields are required!", "danger")
+            return redirect("/generate_qr")
+
+        # Insert session into the sessions table with a default created_by value (e.g., 0)
+        session_id = db.execute("""
+            INSERT INTO sessions (date, semester, slot, subject_id, attendance_type, created_by)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, date, semester, slot, subject_catalog.get_or_create(subject), attendance_type, 1)  # Using 0 as the default value for created_by
+
+        # Drop any cached resolution of the legacy payload now that the session changed
+        session_cache.pop(f"{date},{semester},{slot},{subject},{attendance_type}")
+
+        # Generate QR code with session details
+        data = qr_payload(session_id, date, semester, slot, subject, attendance_type)
+
+        # Render (or reuse) the QR image in the requested format
+        fmt, box_size = qr_options(request.form)
+        image, _ = qr_cache.get(data, fmt, box_size)
+
+        # Return the generated QR code as an image file
+        return send_file(BytesIO(image), mimetype=MIMETYPES[fmt], as_attachment=True, download_name=f"attendance_qr.{fmt}")
 
     return render_template("generate_qr.html")
 
 
+@app.route("/import_timetable", methods=["GET", "POST"])
+@login_required
+@admin_required
+def import_timetable():
+    global qr_render_pool
+
+    if request.method == "POST":
+        timetable = request.files.get("timetable")
+        if not timetable or not timetable.filename:
+            flash("Please choose a timetable CSV file.", "danger")
+            return redirect("/import_timetable")
+
+        try:
+            rows, errors = parse_timetable(timetable.stream, max_rows=app.config["TIMETABLE_MAX_ROWS"])
+        except UnicodeDecodeError:
+            flash("The timetable must be a UTF-8 encoded CSV file.", "danger")
+            return redirect("/import_timetable")
+        except csv.Error as e:
+            flash(f"The timetable is not a valid CSV file: {e}", "danger")
+            return redirect("/import_timetable")
+        if errors:
+            for error in errors[:10]:
+                flash(error, "danger")
+            return redirect("/import_timetable")
+        if not rows:
+            flash("The timetable has no sessions.", "danger")
+            return redirect("/import_timetable")
+
+        # Register any new subjects, then insert every session in a single transaction
+        subject_ids = {subject: subject_catalog.get_or_create(subject) for subject in {row[3] for row in rows}}
+        fmt, box_size = qr_options(request.form)
+        files = []
+        with db.transaction():
+            for date, semester, slot, subject, attendance_type in rows:
+                session_id = db.execute("""
+                    INSERT INTO sessions (date, semester, slot, subject_id, attendance_type, created_by)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, date, semester, slot, subject_ids[subject], attendance_type, session["user_id"])
+                session_cache.pop(f"{date},{semester},{slot},{subject},{attendance_type}")
+                data = qr_payload(session_id, date, semester, slot, subject, attendance_type)
+                filename = secure_filename(f"{session_id}-{date}-slot{slot}-{subject}-{attendance_type}.{fmt}")
+                files.append((filename, data))
+
+        # Render the QR codes in parallel and stream the archive as they finish
+        if qr_render_pool is None:
+            qr_render_pool = ProcessPoolExecutor(max_workers=app.config["QR_RENDER_WORKERS"])
+        # Keep every worker busy without queueing the whole timetable's images
+        window = 2 * app.config["QR_RENDER_WORKERS"]
+        return app.response_class(
+            stream_with_context(stream_qr_zip(files, qr_render_pool, fmt, box_size, window)),
+            mimetype="application/zip",
+            headers={"Content-Disposition": "attachment; filename=timetable_qr_codes.zip"},
+        )
+
+    return render_template("import_timetable.html")
+
+
+@app.route("/qr/<int:session_id>")
+@login_required
+@admin_required
+def session_qr(session_id):
+    rows = db.execute("""
+        SELECT sessions.date, sessions.semester, sessions.slot, subjects.name AS subject, sessions.attendance_type
+        FROM sessions
+        JOIN subjects ON subjects.id = sessions.subject_id
+        WHERE sessions.id = ?
+    """, session_id)
+    if not rows:
+        return render_template("apology.html", message="Session not found", code=404), 404
+
+    row = rows[0]
+    data = qr_payload(session_id, row["date"], row["semester"], row["slot"], row["subject"], row["attendance_type"])
+    fmt, box_size = qr_options(request.args)
+
+    # Let displays that already hold this image revalidate without a render
+    etag = qr_cache.etag(data, fmt, box_size)
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+        response.set_etag(etag)
+        return response
+
+    image, etag = qr_cache.get(data, fmt, box_size)
+    response = app.response_class(image, mimetype=MIMETYPES[fmt])
+    response.set_etag(etag)
+    return response
+
+
+
+# Resolves a legacy QR payload's fields to its session
+SESSION_LOOKUP_SQL = """
+    SELECT id FROM sessions
+    WHERE date = ? AND semester = ? AND slot = ? AND subject_id = ? AND attendance_type = ?
+"""
+
 
 @app.route('/scan_qr', methods=['POST'])
 def scan_qr():
@@ -333,35 +757,222 @@ def scan_qr():
         flash("No QR code data found.", "danger")
         return redirect("/")
 
-    # Debugging: Print the QR data to the console
-    print("QR Data received:", qr_data)
-
-    # Assuming QR data is a comma-separated string with the required fields
-    try:
-        date, semester, slot, subject, attendance_type = qr_data.split(',')
-        print("Parsed QR Info:", date, semester, slot, subject, attendance_type)  # Debugging: Print the parsed QR info
-    except ValueError as e:
-        print("Error parsing QR data:", e)  # Debugging: Print the error
-        flash("Invalid QR code data.", "danger")
+    if is_token(qr_data):
+        # Signed tokens carry the session id: check the signature, then load the session by primary key
+        session_id = qr_signer.verify(qr_data)
+        if session_id is None or not db.execute("SELECT id FROM sessions WHERE id = ?", session_id):
+            flash("Invalid or expired QR code.", "danger")
+            return redirect("/")
+    else:
+        # Resolve the session from the cache before touching the database
+        session_id = session_cache.get(qr_data)
+        if session_id is None:
+            app.logger.debug("QR data received: %s", qr_data)
+
+            # Assuming QR data is a comma-separated string with the required fields
+            try:
+                date, semester, slot, subject, attendance_type = qr_data.split(',')
+            except ValueError as e:
+                app.logger.debug("Error parsing QR data %r: %s", qr_data, e)
+                flash("Invalid QR code data.", "danger")
+                return redirect("/")
+
+            # Fetch the session ID based on QR code data
+            session_data = db.execute(SESSION_LOOKUP_SQL, (date),(semester),(slot),(subject_catalog.id_for(subject)),(attendance_type))
+
+            if not session_data:
+                flash("Invalid session data.", "danger")
+                return redirect("/")
+
+            session_id = session_data[0]["id"]
+            session_cache.set(qr_data, session_id)
+
+    if already_marked(session_id, user_id):
+        flash("Your attendance is already marked for this session.", "info")
         return redirect("/")
 
-    # Fetch the session ID based on QR code data
-    session_data = db.execute("""
-        SELECT id FROM sessions
-        WHERE date = ? AND semester = ? AND slot = ? AND subject = ? AND attendance_type = ?
-    """, (date),(semester),(slot),(subject),(attendance_type))
+    # Queue the attendance record for the background writer, or insert it directly
+    # when write-behind is off or its queue is full
+    if attendance_writer is None or not attendance_writer.submit(user_id, session_id):
+        inserted = db.execute("""
+            INSERT INTO attendance (user_id, session_id) VALUES (?, ?)
+            ON CONFLICT (user_id, session_id) DO NOTHING
+            RETURNING id
+        """, (user_id),(session_id))
+        if not inserted:
+            remember_marked(session_id, user_id)
+            flash("Your attendance is already marked for this session.", "info")
+            return redirect("/")
+    remember_marked(session_id, user_id)
 
-    if not session_data:
-        flash("Invalid session data.", "danger")
-        return redirect("/")
+    flash("Attendance marked successfully!", "success")
+    return redirect("/")
 
-    session_id = session_data[0]["id"]
 
-    # Insert the attendance record into the database
-    db.execute("INSERT INTO attendance (user_id, session_id) VALUES (?, ?)", (user_id),(session_id))
+def parse_qr_data(qr_data):
+    """Split a QR payload into its (date, semester, slot, subject, attendance_type) fields."""
+    fields = qr_data.split(",") if isinstance(qr_data, str) else []
+    if len(fields) != 5 or not all(fields):
+        return None
+    return tuple(fields)
 
-    flash("Attendance marked successfully!", "success")
-    return redirect("/")
+
+def parse_scanned_at(value):
+    """Turn an ISO 8601 scan time into the UTC "YYYY-MM-DD HH:MM:SS" that marked_on holds.
+
+    A trailing "Z" and UTC offsets are accepted and converted to UTC; a time
+    without an offset is taken to be UTC already, like CURRENT_TIMESTAMP.
+    Raises ValueError or TypeError for anything else.
+    """
+    if isinstance(value, str) and value[-1:] in ("Z", "z"):
+        # datetime.fromisoformat only learns "Z" in Python 3.11
+        value = value[:-1] + "+00:00"
+    scanned = datetime.fromisoformat(value)
+    if scanned.tzinfo is not None:
+        scanned = scanned.astimezone(timezone.utc)
+    return scanned.strftime("%Y-%m-%d %H:%M:%S")
+
+
+@app.route("/scan_qr/batch", methods=["POST"])
+@login_required
+@admin_required
+def scan_qr_batch():
+    payload = request.get_json(silent=True)
+    records = payload.get("records") if isinstance(payload, dict) else payload
+
+    if not isinstance(records, list):
+        return jsonify({"error": "Expected a JSON list of scan records."}), 400
+    if len(records) > app.config["SCAN_BATCH_LIMIT"]:
+        return jsonify({"error": f"At most {app.config['SCAN_BATCH_LIMIT']} records per batch."}), 413
+
+    # Validate every record up front so one bad scan doesn't sink the batch
+    results = []
+    pending = []
+    signed = {}
+    for index, record in enumerate(records):
+        if not isinstance(record, dict):
+            results.append({"index": index, "status": "error", "error": "Record must be an object."})
+            continue
+        try:
+            user_id = int(record.get("user_id"))
+        except (TypeError, ValueError):
+            results.append({"index": index, "status": "error", "error": "Invalid user_id."})
+            continue
+        qr_data = record.get("qr_data")
+        if is_token(qr_data):
+            fields = None
+            session_id = qr_signer.verify(qr_data)
+            if session_id is None:
+                results.append({"index": index, "status": "error", "error": "Invalid or expired QR code."})
+                continue
+            signed[qr_data] = session_id
+        else:
+            fields = parse_qr_data(qr_data)
+            if fields is None:
+                results.append({"index": index, "status": "error", "error": "Invalid QR code data."})
+                continue
+        scanned_at = record.get("scanned_at")
+        if scanned_at is not None:
+            try:
+                scanned_at = parse_scanned_at(scanned_at)
+            except (TypeError, ValueError):
+                results.append({"index": index, "status": "error", "error": "Invalid scanned_at timestamp."})
+                continue
+        result = {"index": index, "status": "ok"}
+        results.append(result)
+        pending.append((result, user_id, qr_data, fields, scanned_at))
+
+    # Signed tokens name their session directly; only check that it still exists
+    resolved = {}
+    if signed:
+        session_ids = sorted(set(signed.values()))
+        existing = {row["id"] for row in db.execute(
+            f"SELECT id FROM sessions WHERE id IN ({', '.join(['?'] * len(session_ids))})", *session_ids
+        )}
+        resolved.update({qr_data: session_id for qr_data, session_id in signed.items() if session_id in existing})
+
+    # Resolve every distinct uncached legacy payload with a single query
+    unresolved = {}
+    for _, _, qr_data, fields, _ in pending:
+        if fields is None or qr_data in resolved or qr_data in unresolved:
+            continue
+        session_id = session_cache.get(qr_data)
+        if session_id is not None:
+            resolved[qr_data] = session_id
+            continue
+        date, semester, slot, subject, attendance_type = fields
+        subject_id = subject_catalog.id_for(subject)
+        if subject_id is not None:
+            unresolved[qr_data] = (date, semester, slot, subject_id, attendance_type)
+
+    if unresolved:
+        wanted = list(unresolved.items())
+        rows = db.execute(f"""
+            WITH wanted (k, date, semester, slot, subject_id, attendance_type) AS (
+                VALUES {", ".join(["(?, ?, ?, ?, ?, ?)"] * len(wanted))}
+            )
+            SELECT wanted.k AS k, MIN(sessions.id) AS session_id
+            FROM wanted
+            JOIN sessions ON sessions.date = wanted.date
+                AND sessions.semester = wanted.semester
+                AND sessions.slot = wanted.slot
+                AND sessions.subject_id = wanted.subject_id
+                AND sessions.attendance_type = wanted.attendance_type
+            GROUP BY wanted.k
+        """, *[value for k, (_, fields) in enumerate(wanted) for value in (k, *fields)])
+        for row in rows:
+            qr_data = wanted[row["k"]][0]
+            resolved[qr_data] = row["session_id"]
+            session_cache.set(qr_data, row["session_id"])
+
+    # Only insert scans for users that exist
+    user_ids = sorted({user_id for _, user_id, _, _, _ in pending})
+    known_users = set()
+    if user_ids:
+        known_users = {row["id"] for row in db.execute(
+            f"SELECT id FROM users WHERE id IN ({', '.join(['?'] * len(user_ids))})", *user_ids
+        )}
+
+    # Skip rescans within the batch and students this process already saw marked
+    candidates = []
+    seen = set()
+    for result, user_id, qr_data, _, scanned_at in pending:
+        if qr_data not in resolved:
+            result.update(status="error", error="Invalid session data.")
+        elif user_id not in known_users:
+            result.update(status="error", error="Unknown user.")
+        else:
+            session_id = result["session_id"] = resolved[qr_data]
+            if (user_id, session_id) in seen or already_marked(session_id, user_id):
+                result["status"] = "already_marked"
+            else:
+                seen.add((user_id, session_id))
+                candidates.append((result, user_id, session_id, scanned_at))
+
+    # Then skip those the database already holds, checked with a single query
+    marked = set()
+    if candidates:
+        marked = {(row["user_id"], row["session_id"]) for row in db.execute(f"""
+            SELECT user_id, session_id FROM attendance
+            WHERE (user_id, session_id) IN (VALUES {", ".join(["(?, ?)"] * len(candidates))})
+        """, *[value for _, user_id, session_id, _ in candidates for value in (user_id, session_id)])}
+    rows = []
+    for result, user_id, session_id, scanned_at in candidates:
+        if (user_id, session_id) in marked:
+            result["status"] = "already_marked"
+        else:
+            rows.append((user_id, session_id, scanned_at))
+
+    # Insert the whole batch in one transaction
+    with db.transaction():
+        inserted = db.executemany(
+            "INSERT OR IGNORE INTO attendance (user_id, session_id, marked_on) VALUES (?, ?, COALESCE(?, CURRENT_TIMESTAMP))",
+            rows,
+        )
+    for _, user_id, session_id, _ in candidates:
+        remember_marked(session_id, user_id)
+
+    return jsonify({"inserted": inserted, "results": results})
 
 
 
@@ -374,98 +985,208 @@ def scan_qr():
 @admin_required
 def show_attendance_csv_settings():
     if request.method == 'POST':
-        date = request.form.get('date')
-        semester = request.form.get('semester')
-        slot = request.form.get('slot')
-        subject = request.form.get('subject')
-        attendance_type = request.form.get('attendance_type')
-
         # Redirect to download filtered attendance CSV with parameters
+        fields = ['date', 'date_from', 'date_to', 'semester', 'slot', 'subject', 'attendance_type', 'gzip']
         return redirect(url_for('download_filtered_attendance_csv',
-                                date=date,
-                                semester=semester,
-                                slot=slot,
-                                subject=subject,
-                                attendance_type=attendance_type))
+                                **{field: request.form.get(field) for field in fields if request.form.get(field)}))
 
     return render_template('show_attendance_csv_settings.html')
 
 
-@app.route('/download_filtered_attendance_csv', methods=['POST'])
+def form_values(name):
+    """Collect a multi-value field, from repeated fields or comma-separated values."""
+    values = []
+    for value in request.values.getlist(name):
+        values.extend(part.strip() for part in value.split(",") if part.strip())
+    return values
+
+
+def export_filters(date_from, date_to, semesters, slots, subject_ids, attendance_types):
+    """Build the export's WHERE conditions and their parameters from whichever filters were given."""
+    conditions = []
+    params = []
+    if date_from:
+        conditions.append("attendance.day >= ?")
+        params.append(date_from)
+    if date_to:
+        conditions.append("attendance.day <= ?")
+        params.append(date_to)
+    for column, values in [("semester", semesters), ("slot", slots), ("subject_id", subject_ids), ("attendance_type", attendance_types)]:
+        if values:
+            conditions.append(f"sessions.{column} IN ({', '.join(['?'] * len(values))})")
+            params.extend(values)
+    return conditions, params
+
+
+def export_query(schemas, conditions):
+    """Export SQL over the given schemas, in the order scans were marked.
+
+    Each schema holds whole sessions, so it is joined on its own and the
+    results merged; its parameters repeat once per schema.
+    """
+    return " UNION ALL ".join(f"""
+        SELECT attendance.day,
+               attendance.id AS attendance_id,
+               attendance.user_id,
+               users.username AS user_name,
+               attendance.session_id,
+               attendance.marked_on,
+               sessions.semester,
+               sessions.slot,
+               subjects.name AS subject,
+               sessions.attendance_type
+        FROM {schema}.attendance AS attendance
+        JOIN {schema}.sessions AS sessions ON attendance.session_id = sessions.id
+        JOIN main.subjects AS subjects ON subjects.id = sessions.subject_id
+        JOIN main.users AS users ON users.id = attendance.user_id
+        WHERE {" AND ".join(conditions)}
+    """ for schema in schemas) + " ORDER BY day, marked_on, attendance_id"
+
+
+@app.route('/download_filtered_attendance_csv', methods=['GET', 'POST'])
 @login_required
+@admin_required
 def download_filtered_attendance_csv():
-    date = request.form.get('date')
-    semester = request.form.get('semester')
-    slot = request.form.get('slot')
-    subject = request.form.get('subject')
-    attendance_type = request.form.get('attendance_type')
-
-    if not all([date, semester, slot, subject, attendance_type]):
-        flash("All fields are required.", "danger")
+    # A single date still works; date_from/date_to select a range
+    date = request.values.get('date')
+    date_from = request.values.get('date_from') or date
+    date_to = request.values.get('date_to') or date
+    semesters = form_values('semester')
+    slots = form_values('slot')
+    subjects = form_values('subject')
+    attendance_types = form_values('attendance_type')
+    compress = request.values.get('gzip') in ("1", "on", "true")
+
+    try:
+        for value in (date_from, date_to):
+            if value:
+                datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        flash("Dates must be in YYYY-MM-DD format.", "danger")
+        return redirect("/show_attendance_csv_settings")
+
+    if not any([date_from, date_to, semesters, slots, subjects, attendance_types]):
+        flash("Choose at least one filter.", "danger")
+        return redirect("/show_attendance_csv_settings")
+
+    # Subjects are matched by id; a name missing from the catalog becomes NULL, which matches nothing
+    subject_ids = [subject_catalog.id_for(subject) for subject in subjects]
+    conditions, params = export_filters(date_from, date_to, semesters, slots, subject_ids, attendance_types)
+
+    # Read the hot database plus any archived terms the date range reaches
+    try:
+        schemas = archive.schemas_for(db, date_from, date_to)
+    except ValueError as e:
+        flash(str(e), "danger")
         return redirect("/show_attendance_csv_settings")
 
     try:
-        # Debug: Print filter parameters
-        print("Filter parameters:", (date), (semester), (slot), (subject), (attendance_type))
-
-        # Fetch filtered attendance data including user name
-        attendance_data = db.execute("""
-            SELECT attendance.user_id,
-                   (SELECT username FROM users WHERE users.id = attendance.user_id) AS user_name,
-                   attendance.session_id,
-                   attendance.marked_on,
-                   sessions.semester,
-                   sessions.slot,
-                   sessions.subject,
-                   sessions.attendance_type
-            FROM attendance
-            JOIN sessions ON attendance.session_id = sessions.id
-            WHERE DATE(attendance.marked_on) = ?
-              AND sessions.semester = ?
-              AND sessions.slot = ?
-              AND sessions.subject = ?
-              AND sessions.attendance_type = ?
-        """, (date), (semester), (slot), (subject), (attendance_type))  # Enclose values in round brackets
-
-        # Debug: Print fetched data
-        print("Attendance Data:", (attendance_data))
-
-        if not attendance_data:
-            flash("No matching records found.", "danger")
-            return redirect("/show_attendance_csv_settings")
-
-        # Dynamically name the CSV file based on session details
-        session_info = attendance_data[0]  # Assume at least one record exists
+        app.logger.debug("Export filters: date_from=%s date_to=%s semesters=%s slots=%s subjects=%s types=%s",
+                         date_from, date_to, semesters, slots, subjects, attendance_types)
+
+        # Fetch filtered attendance data including user name, a chunk at a time
+        chunks = db.iterate(export_query(schemas, conditions), *params * len(schemas),
+                            size=app.config["EXPORT_CHUNK_SIZE"])
+        first_chunk = next(chunks, None)
+    except Exception as e:
+        app.logger.exception("Attendance export query failed: %s", e)
+        flash("Error fetching attendance data.", "danger")
+        return redirect("/show_attendance_csv_settings")
+
+    if not first_chunk:
+        flash("No matching records found.", "danger")
+        return redirect("/show_attendance_csv_settings")
+
+    # Name a single-session export after the session, anything wider after its date range
+    if date_from and date_from == date_to and len(semesters) == len(slots) == len(subjects) == 1:
+        session_info = first_chunk[0]
         csv_filename = f"{session_info['session_id']}-{session_info['slot']}-{session_info['semester']}-class-{session_info['subject']}.csv"
+    else:
+        csv_filename = f"attendance-{date_from or 'start'}-to-{date_to or 'end'}.csv"
 
-        # Create CSV file in StringIO
+    def generate():
         output = StringIO()
         writer = csv.writer(output, quoting=csv.QUOTE_MINIMAL)
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+
+        def flush():
+            data = output.getvalue().encode('utf-8')
+            output.seek(0)
+            output.truncate()
+            return compressor.compress(data) if compressor else data
 
         # Write header
         writer.writerow(['User ID', 'User Name', 'Session ID', 'Marked On', 'Semester', 'Slot', 'Subject', 'Attendance Type'])
 
-        # Write rows
-        for row in attendance_data:
-            writer.writerow([
-                (row['user_id']), (row['user_name']), (row['session_id']), (row['marked_on']),
-                (row['semester']), (row['slot']), (row['subject']), (row['attendance_type'])
-            ])
-
-        # Convert StringIO to BytesIO
-        byte_output = BytesIO(output.getvalue().encode('utf-8'))
-        output.close()
-
-        # Return as downloadable file
-        return send_file(byte_output,
-                         mimetype='text/csv',
-                         as_attachment=True,
-                         download_name=csv_filename)
-
-    except Exception as e:
-        print("SQL Query Error:", (e))  # Debug: Print error details enclosed in brackets
-        flash("Error fetching attendance data.", "danger")
-        return redirect("/show_attendance_csv_settings")
+        # Write rows one chunk at a time
+        for rows in itertools.chain([first_chunk], chunks):
+            for row in rows:
+                writer.writerow([
+                    (row['user_id']), (row['user_name']), (row['session_id']), (row['marked_on']),
+                    (row['semester']), (row['slot']), (row['subject']), (row['attendance_type'])
+                ])
+            yield flush()
+
+        if compressor:
+            yield compressor.flush()
+
+    # Return as a streamed download
+    if compress:
+        csv_filename += ".gz"
+    return app.response_class(
+        stream_with_context(generate()),
+        mimetype="application/gzip" if compress else "text/csv",
+        headers={"Content-Disposition": f"attachment; filename={secure_filename(csv_filename)}"},
+    )
+
+
+@app.cli.command("archive-terms")
+@click.option("--before", help="Archive terms that ended before this YYYY-MM-DD date (default: start of the current term).")
+def archive_terms_command(before):
+    """Move closed terms' sessions and attendance into per-term archive files."""
+    before = before or archive.current_term_start()
+    archived = archive.archive_before(db, app.config["ARCHIVE_DIR"], before)
+    for row in archived:
+        print(f"{row['term']}: {row['sessions']} sessions, {row['attendance']} attendance rows -> {row['path']}")
+    if not archived:
+        print(f"No closed terms before {before} left to archive.")
+
+
+def hot_queries():
+    """Return {name: (sql, args)} for the queries that must keep using their indexes."""
+    day = datetime.now().strftime("%Y-%m-%d")
+    export_conditions, export_params = export_filters(day, day, [], [], [], [])
+    return {
+        "export": (export_query(["main"], export_conditions), export_params),
+        "admin attendance": attendance_page_query(None, app.config["ADMIN_PAGE_SIZE"]),
+        "admin attendance (next page)": attendance_page_query((f"{day} 00:00:00", 1), app.config["ADMIN_PAGE_SIZE"]),
+        "admin sessions": sessions_page_query(1, None, app.config["ADMIN_PAGE_SIZE"]),
+        "admin sessions (next page)": sessions_page_query(1, (day, 1), app.config["ADMIN_PAGE_SIZE"]),
+        "scan lookup": (SESSION_LOOKUP_SQL, (day, 1, 1, 1, "class")),
+        "subject attendance": (SUBJECT_ATTENDANCE_SQL, (1,)),
+    }
+
+
+@app.cli.command("check-query-plans")
+def check_query_plans_command():
+    """Fail if a hot query stops using its index and falls back to a full scan or sort."""
+    failed = False
+    for name, (sql, args) in hot_queries().items():
+        plan = query_plans.explain(db, sql, *args)
+        bad = query_plans.problems(plan)
+        print(f"{'FAIL' if bad else 'ok'}  {name}")
+        for detail in bad:
+            print(f"      {detail}")
+        failed = failed or bool(bad)
+    if failed:
+        raise SystemExit(1)
+
+
+@app.cli.command("rebuild-summaries")
+def rebuild_summaries_command():
+    """Recompute the attendance summary tables from scratch."""
+    rebuild_summaries(db)
+    print("Attendance summaries rebuilt.")
 
 
 if __name__ == "__main__":
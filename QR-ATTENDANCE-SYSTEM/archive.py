@@ -0,0 +1,152 @@
+"""Moves closed terms' sessions and attendance out of the hot database.
+
+A term is a calendar half-year of session dates: 2024-1 runs January to
+June 2024 and 2024-2 July to December. Each archived term gets its own
+SQLite file, and the archives table in the hot database records which
+dates each file covers, so readers attach only the files a requested
+range needs.
+"""
+
+import os
+from datetime import date
+
+SESSION_COLUMNS = "id, date, semester, slot, subject_id, attendance_type, created_by"
+ATTENDANCE_COLUMNS = "id, user_id, session_id, marked_on"
+
+ARCHIVE_SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS {schema}.sessions (
+           id INTEGER PRIMARY KEY,
+           date TEXT NOT NULL,
+           semester INTEGER NOT NULL,
+           slot INTEGER NOT NULL,
+           subject_id INTEGER,
+           attendance_type TEXT NOT NULL,
+           created_by INTEGER NOT NULL
+       )""",
+    """CREATE TABLE IF NOT EXISTS {schema}.attendance (
+           id INTEGER PRIMARY KEY,
+           user_id INTEGER NOT NULL,
+           session_id INTEGER NOT NULL,
+           marked_on TIMESTAMP,
+           day TEXT GENERATED ALWAYS AS (DATE(marked_on)) VIRTUAL
+       )""",
+    "CREATE INDEX IF NOT EXISTS {schema}.idx_attendance_day ON attendance (day, marked_on, id, user_id, session_id)",
+    "CREATE INDEX IF NOT EXISTS {schema}.idx_attendance_session ON attendance (session_id, user_id, marked_on)",
+    "CREATE INDEX IF NOT EXISTS {schema}.idx_sessions_date ON sessions (date)",
+]
+
+# SQLite attaches at most 10 databases to a connection
+MAX_ATTACHED = 10
+
+
+def term_for(day):
+    """Return the term a YYYY-MM-DD date falls in, e.g. 2024-2."""
+    return f"{day[:4]}-{1 if int(day[5:7]) <= 6 else 2}"
+
+
+def term_bounds(term):
+    """Return the first and last date of a term as YYYY-MM-DD strings."""
+    year, half = term.split("-")
+    return (f"{year}-01-01", f"{year}-06-30") if half == "1" else (f"{year}-07-01", f"{year}-12-31")
+
+
+def current_term_start(today=None):
+    """Return the first date of the term today falls in."""
+    return term_bounds(term_for((today or date.today()).isoformat()))[0]
+
+
+def archive_term(db, directory, term):
+    """Move one term's sessions and their attendance into its archive file.
+
+    Rows are copied in one transaction and deleted from the hot database in
+    a second, by id, only once the copy has committed: WAL mode does not
+    make a transaction spanning attached files atomic, so a crash in between
+    leaves rows in both places (a rerun replaces them) rather than in none.
+    Returns the archive's row in the archives table.
+    """
+    date_from, date_to = term_bounds(term)
+    os.makedirs(directory, exist_ok=True)
+    # Stored absolute so exports find the file whatever directory the app runs from
+    path = os.path.abspath(os.path.join(directory, f"attendance-{term}.db"))
+    schema = db.attach(path)
+    try:
+        upgrade(db, schema)
+
+        with db.transaction():
+            db.execute(f"""
+                INSERT OR REPLACE INTO {schema}.sessions ({SESSION_COLUMNS})
+                SELECT {SESSION_COLUMNS} FROM main.sessions WHERE date BETWEEN ? AND ?
+            """, date_from, date_to)
+            db.execute(f"""
+                INSERT OR REPLACE INTO {schema}.attendance ({ATTENDANCE_COLUMNS})
+                SELECT {ATTENDANCE_COLUMNS} FROM main.attendance
+                WHERE session_id IN (SELECT id FROM main.sessions WHERE date BETWEEN ? AND ?)
+            """, date_from, date_to)
+
+        with db.transaction():
+            db.execute(f"DELETE FROM main.attendance WHERE id IN (SELECT id FROM {schema}.attendance)")
+            # Scans that arrived after the copy keep their session in the hot database
+            db.execute(f"""
+                DELETE FROM main.sessions
+                WHERE id IN (SELECT id FROM {schema}.sessions)
+                  AND NOT EXISTS (SELECT 1 FROM main.attendance WHERE session_id = main.sessions.id)
+            """)
+            # The covered range spans both session dates and the days scans were marked on
+            db.execute(f"""
+                INSERT INTO archives (term, path, date_from, date_to, sessions, attendance)
+                SELECT ?, ?,
+                       MIN(?, COALESCE((SELECT DATE(MIN(marked_on)) FROM {schema}.attendance), ?)),
+                       MAX(?, COALESCE((SELECT DATE(MAX(marked_on)) FROM {schema}.attendance), ?)),
+                       (SELECT COUNT(*) FROM {schema}.sessions),
+                       (SELECT COUNT(*) FROM {schema}.attendance)
+                WHERE true
+                ON CONFLICT (term) DO UPDATE SET
+                    path = excluded.path, date_from = excluded.date_from, date_to = excluded.date_to,
+                    sessions = excluded.sessions, attendance = excluded.attendance,
+                    archived_on = CURRENT_TIMESTAMP
+            """, term, path, date_from, date_from, date_to, date_to)
+    finally:
+        db.detach(schema)
+    return db.execute("SELECT * FROM archives WHERE term = ?", term)[0]
+
+
+def upgrade(db, schema):
+    """Create the archive tables in an attached schema, or bring older archives up to date."""
+    columns = {row["name"] for row in db.execute(f"PRAGMA {schema}.table_xinfo(attendance)")}
+    if columns and "day" not in columns:
+        db.execute(f"ALTER TABLE {schema}.attendance ADD COLUMN day TEXT GENERATED ALWAYS AS (DATE(marked_on)) VIRTUAL")
+        db.execute(f"DROP INDEX IF EXISTS {schema}.idx_attendance_marked_on")
+    for statement in ARCHIVE_SCHEMA:
+        db.execute(statement.format(schema=schema))
+
+
+def archive_before(db, directory, before):
+    """Archive every term that ended before the YYYY-MM-DD date before; return their archives rows."""
+    days = [row["date"] for row in db.execute("SELECT DISTINCT date FROM sessions WHERE date < ?", before)]
+    terms = sorted({term_for(day) for day in days})
+    return [archive_term(db, directory, term) for term in terms if term_bounds(term)[1] < before]
+
+
+def schemas_for(db, date_from=None, date_to=None):
+    """Attach the archives overlapping [date_from, date_to] and return every schema to read.
+
+    The hot database comes first as "main". Archives stay attached until
+    db.detach_all() at the end of the request. Raises ValueError when the
+    range needs more archives than SQLite can attach at once, or when an
+    archive file is missing, since attaching it would create an empty one.
+    """
+    rows = db.execute("""
+        SELECT path FROM archives
+        WHERE date_to >= ? AND date_from <= ?
+        ORDER BY date_from
+    """, date_from or "0000-00-00", date_to or "9999-99-99")
+    if len(rows) > MAX_ATTACHED:
+        raise ValueError(f"The range spans {len(rows)} archived terms; at most {MAX_ATTACHED} can be read at once.")
+    missing = [row["path"] for row in rows if not os.path.isfile(row["path"])]
+    if missing:
+        raise ValueError(f"Archived attendance is missing: {', '.join(missing)}")
+    schemas = ["main"]
+    for row in rows:
+        schemas.append(db.attach(row["path"]))
+        upgrade(db, schemas[-1])
+    return schemas
@@ -0,0 +1,216 @@
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import closing
+from datetime import datetime, timezone
+
+from database import connect
+
+logger = logging.getLogger(__name__)
+
+
+class AttendanceWriter:
+    """Write-behind queue that group-commits attendance inserts.
+
+    Scans are acknowledged as soon as they are queued; a background thread
+    drains the queue and writes each batch in a single transaction, flushing
+    when either batch_size rows are waiting or flush_interval seconds pass.
+    """
+
+    def __init__(self, database, max_queue=10000, batch_size=200, flush_interval=0.05, max_retries=8):
+        self.database = database
+        self.max_retries = max_retries
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.enqueued = 0
+        self.rejected = 0
+        self.written = 0
+        self.duplicates = 0
+        self.failed = 0
+        self.retries = 0
+        self.requeued = 0
+        self.flushes = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self.total_flush_ms = 0.0
+
+    def start(self):
+        """Switch the database to WAL and start the writer thread."""
+        if self._thread is not None:
+            return
+        # Opening a configured connection switches the file to WAL up front
+        with closing(connect(self.database)):
+            pass
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="attendance-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=10):
+        """Flush everything still queued and stop the writer thread."""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def submit(self, user_id, session_id, marked_on=None):
+        """Queue one attendance row; return False if the queue is full."""
+        if marked_on is None:
+            marked_on = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        try:
+            self._queue.put_nowait((user_id, session_id, marked_on))
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            return False
+        with self._lock:
+            self.enqueued += 1
+        return True
+
+    def stats(self):
+        """Return queue depth and flush latency counters."""
+        with self._lock:
+            return {
+                "running": self._thread is not None,
+                "queue_depth": self._queue.qsize(),
+                "queue_capacity": self._queue.maxsize,
+                "enqueued": self.enqueued,
+                "rejected": self.rejected,
+                "written": self.written,
+                "duplicates": self.duplicates,
+                "failed": self.failed,
+                "retries": self.retries,
+                "requeued": self.requeued,
+                "flushes": self.flushes,
+                "last_flush_ms": self.last_flush_ms,
+                "max_flush_ms": self.max_flush_ms,
+                "avg_flush_ms": self.total_flush_ms / self.flushes if self.flushes else 0.0,
+            }
+
+    def _drain(self):
+        """Collect up to batch_size rows, waiting at most flush_interval after the first."""
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, conn, batch):
+        """Insert batch in one transaction; return (inserted, rows that failed)."""
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("SAVEPOINT batch")
+            try:
+                inserted = conn.executemany(
+                    "INSERT OR IGNORE INTO attendance (user_id, session_id, marked_on) VALUES (?, ?, ?)", batch
+                ).rowcount
+                failed = 0
+            except sqlite3.IntegrityError:
+                # One bad row aborts executemany but keeps the rows before it;
+                # undo those, then insert row by row and skip only the bad ones
+                conn.execute("ROLLBACK TO batch")
+                inserted = failed = 0
+                for row in batch:
+                    try:
+                        inserted += conn.execute(
+                            "INSERT OR IGNORE INTO attendance (user_id, session_id, marked_on) VALUES (?, ?, ?)", row
+                        ).rowcount
+                    except sqlite3.IntegrityError as e:
+                        logger.error("Attendance writer dropped %r: %s", row, e)
+                        failed += 1
+            conn.execute("RELEASE batch")
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        return inserted, failed
+
+    def _flush(self, conn, batch):
+        started = time.perf_counter()
+        # These scans were already acknowledged: a locked or busy database is
+        # retried with backoff, and a batch that still can't be written goes
+        # back on the queue rather than being dropped
+        for attempt in range(self.max_retries + 1):
+            try:
+                inserted, failed = self._write(conn, batch)
+                break
+            except sqlite3.OperationalError as e:
+                if attempt == self.max_retries:
+                    if self._stop.is_set():
+                        # Shutting down: nothing would drain a requeued batch
+                        logger.error("Attendance writer dropped %d rows at shutdown: %s", len(batch), e)
+                        with self._lock:
+                            self.failed += len(batch)
+                    else:
+                        logger.error("Attendance writer requeueing %d rows: %s", len(batch), e)
+                        self._requeue(batch)
+                    return
+                with self._lock:
+                    self.retries += 1
+                logger.warning("Attendance writer retrying after: %s", e)
+                time.sleep(min(0.05 * 2 ** attempt, 1.0))
+            except sqlite3.Error as e:
+                logger.error("Attendance writer error: %s", e)
+                with self._lock:
+                    self.failed += len(batch)
+                return
+        elapsed = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self.written += inserted
+            self.failed += failed
+            self.duplicates += len(batch) - inserted - failed
+            self.flushes += 1
+            self.last_flush_ms = elapsed
+            self.max_flush_ms = max(self.max_flush_ms, elapsed)
+            self.total_flush_ms += elapsed
+
+    def _requeue(self, batch):
+        requeued = 0
+        for row in batch:
+            try:
+                self._queue.put_nowait(row)
+                requeued += 1
+            except queue.Full:
+                break
+        with self._lock:
+            self.requeued += requeued
+            self.failed += len(batch) - requeued
+        if requeued < len(batch):
+            logger.error("Attendance writer queue full, dropped %d rows", len(batch) - requeued)
+
+    def _run(self):
+        conn = connect(self.database)
+        try:
+            while not self._stop.is_set():
+                batch = self._drain()
+                if batch:
+                    self._flush(conn, batch)
+            # Shutdown: write out whatever is still queued
+            while True:
+                batch = []
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if not batch:
+                    break
+                self._flush(conn, batch)
+        finally:
+            conn.close()
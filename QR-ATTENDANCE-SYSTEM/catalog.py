@@ -0,0 +1,79 @@
+import threading
+import time
+
+from schema import DEFAULT_DEPARTMENT
+
+
+class SubjectCatalog:
+    """In-process copy of the subjects table, reloaded whenever it changes.
+
+    Lookups of a name this process has not seen yet reload the table, so
+    subjects added by another worker are picked up on first use. Such
+    reloads happen at most once every reload_interval seconds, so unknown
+    names (stale links, bad filters) can't force a reload per request.
+    """
+
+    def __init__(self, db, reload_interval=5):
+        self.db = db
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._by_name = None
+        self._by_id = None
+        self._loaded_at = 0
+
+    def _load(self):
+        with self._lock:
+            if self._by_name is None:
+                rows = self.db.execute("SELECT id, name FROM subjects ORDER BY name")
+                self._by_name = {row["name"]: row["id"] for row in rows}
+                self._by_id = {row["id"]: row["name"] for row in rows}
+                self._loaded_at = time.monotonic()
+            return self._by_name, self._by_id
+
+    def _reload_on_miss(self, key):
+        """Reload after a lookup of key missed, unless the copy is fresher than reload_interval."""
+        if key is None:
+            return False
+        with self._lock:
+            if time.monotonic() - self._loaded_at < self.reload_interval:
+                return False
+            self._by_name = None
+            self._by_id = None
+        return True
+
+    def invalidate(self):
+        """Drop the cached copy; the next lookup reloads it."""
+        with self._lock:
+            self._by_name = None
+            self._by_id = None
+
+    def all(self):
+        """Return every subject as {"id", "name"}, sorted by name."""
+        by_name, _ = self._load()
+        return [{"id": subject_id, "name": name} for name, subject_id in by_name.items()]
+
+    def id_for(self, name):
+        """Return the id of the subject called name, or None."""
+        by_name, _ = self._load()
+        if name not in by_name and self._reload_on_miss(name):
+            by_name, _ = self._load()
+        return by_name.get(name)
+
+    def name_for(self, subject_id):
+        """Return the name of the subject with subject_id, or None."""
+        _, by_id = self._load()
+        if subject_id not in by_id and self._reload_on_miss(subject_id):
+            _, by_id = self._load()
+        return by_id.get(subject_id)
+
+    def get_or_create(self, name):
+        """Return the id of the subject called name, adding it if it is new."""
+        subject_id = self.id_for(name)
+        if subject_id is None:
+            self.db.execute("""
+                INSERT OR IGNORE INTO subjects (name, department_id)
+                VALUES (?, (SELECT id FROM departments WHERE name = ?))
+            """, name, DEFAULT_DEPARTMENT)
+            self.invalidate()
+            subject_id = self.id_for(name)
+        return subject_id
@@ -0,0 +1,150 @@
+"""Thin sqlite3 data layer with the same call-site ergonomics as cs50.SQL.
+
+Each thread keeps one connection, configured once when it is opened, and
+sqlite3's per-connection statement cache keeps prepared statements around
+between calls. Rows come back as plain dicts. When on_query is set it is
+called with (sql, seconds) after every statement, for instrumentation.
+"""
+
+import itertools
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+
+
+def dict_factory(cursor, row):
+    """Build a plain dict per row, keyed by column name."""
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+
+def connect(path, row_factory=None):
+    """Open a connection configured for concurrent web traffic."""
+    conn = sqlite3.connect(path, isolation_level=None, cached_statements=256)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute("PRAGMA busy_timeout = 5000")
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.row_factory = row_factory
+    return conn
+
+
+@lru_cache(maxsize=512)
+def _verb(sql):
+    """Return the leading keyword of a statement, e.g. SELECT or INSERT."""
+    words = sql.split(None, 1)
+    return words[0].upper() if words else ""
+
+
+class Database:
+    """Per-thread sqlite3 connections behind a cs50-style execute()."""
+
+    def __init__(self, path):
+        self.path = path
+        self.on_query = None
+        self._local = threading.local()
+
+    def connection(self):
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = connect(self.path, row_factory=dict_factory)
+        return conn
+
+    def execute(self, sql, *args):
+        """Run one statement.
+
+        Returns a list of dict rows for statements that produce rows, the new
+        row id for INSERT and REPLACE, and the number of affected rows otherwise.
+        """
+        started = time.perf_counter()
+        try:
+            cursor = self.connection().execute(sql, args)
+            if cursor.description is not None:
+                return cursor.fetchall()
+            if _verb(sql) in ("INSERT", "REPLACE"):
+                return cursor.lastrowid
+            return cursor.rowcount
+        except sqlite3.IntegrityError as e:
+            raise ValueError(str(e)) from e
+        finally:
+            if self.on_query is not None:
+                self.on_query(sql, time.perf_counter() - started)
+
+    def executemany(self, sql, rows):
+        """Run one statement for every parameter tuple in rows; return the affected row count."""
+        started = time.perf_counter()
+        try:
+            return self.connection().executemany(sql, rows).rowcount
+        except sqlite3.IntegrityError as e:
+            raise ValueError(str(e)) from e
+        finally:
+            if self.on_query is not None:
+                self.on_query(sql, time.perf_counter() - started)
+
+    def iterate(self, sql, *args, size=500):
+        """Yield the rows of a query in lists of at most size rows.
+
+        on_query sees the time spent in SQLite across all fetches, not the
+        time the caller spends between them.
+        """
+        elapsed = 0.0
+        started = time.perf_counter()
+        cursor = self.connection().execute(sql, args)
+        try:
+            while True:
+                rows = cursor.fetchmany(size)
+                elapsed += time.perf_counter() - started
+                if not rows:
+                    break
+                yield rows
+                started = time.perf_counter()
+        finally:
+            cursor.close()
+            if self.on_query is not None:
+                self.on_query(sql, elapsed)
+
+    def attach(self, path):
+        """Attach another database file to this thread's connection; return its schema name.
+
+        Attaching the same path again returns the existing schema name.
+        """
+        attached = self._attached()
+        if path not in attached:
+            in_use = set(attached.values())
+            schema = next(f"archive{n}" for n in itertools.count() if f"archive{n}" not in in_use)
+            self.connection().execute(f"ATTACH DATABASE ? AS {schema}", (path,))
+            attached[path] = schema
+        return attached[path]
+
+    def detach(self, schema):
+        """Detach a schema returned by attach()."""
+        attached = self._attached()
+        for path, name in list(attached.items()):
+            if name == schema:
+                self.connection().execute(f"DETACH DATABASE {schema}")
+                del attached[path]
+
+    def detach_all(self):
+        """Detach everything attached on this thread's connection."""
+        for schema in list(self._attached().values()):
+            self.detach(schema)
+
+    def _attached(self):
+        attached = getattr(self._local, "attached", None)
+        if attached is None:
+            attached = self._local.attached = {}
+        return attached
+
+    @contextmanager
+    def transaction(self):
+        """Group the statements run inside the block into a single transaction."""
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
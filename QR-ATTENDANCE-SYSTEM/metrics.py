@@ -0,0 +1,139 @@
+import re
+import threading
+from collections import OrderedDict, defaultdict
+
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+_WHITESPACE = re.compile(r"\s+")
+# Runs of placeholders from generated IN (...) and VALUES lists
+_PLACEHOLDERS = re.compile(r"\?(?:\s*,\s*\?)+")
+_VALUES_ROWS = re.compile(r"\(\?, \.\.\.\)(?:\s*,\s*\(\?, \.\.\.\))+")
+
+
+def normalize_sql(sql, limit=200):
+    """Collapse a statement to one line with placeholder lists folded, for use as a label."""
+    sql = _WHITESPACE.sub(" ", sql).strip()
+    sql = _PLACEHOLDERS.sub("?, ...", sql)
+    sql = _VALUES_ROWS.sub("(?, ...), ...", sql)
+    return sql[:limit]
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+class _Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                return
+        self.counts[-1] += 1
+
+    def lines(self, name, **labels):
+        cumulative = 0
+        for bound, count in zip(self.buckets + ("+Inf",), self.counts):
+            cumulative += count
+            yield f"{name}_bucket{_labels(**labels, le=bound)} {cumulative}"
+        yield f"{name}_sum{_labels(**labels)} {self.sum:.6f}"
+        yield f"{name}_count{_labels(**labels)} {cumulative}"
+
+
+class Metrics:
+    """Request and query timings per route, rendered in the Prometheus text format.
+
+    Statements slower than slow_query_seconds are kept as samples, one per
+    (route, statement) with its count and worst duration, up to
+    slow_query_samples of them (least recently seen dropped first).
+    """
+
+    def __init__(self, prefix="qr", slow_query_seconds=0.1, slow_query_samples=50):
+        self.prefix = prefix
+        self.slow_query_seconds = slow_query_seconds
+        self.slow_query_samples = slow_query_samples
+        self._lock = threading.Lock()
+        self._requests = defaultdict(int)
+        self._request_seconds = {}
+        self._query_seconds = {}
+        self._slow_queries = defaultdict(int)
+        self._slow_samples = OrderedDict()
+
+    def observe_request(self, route, method, status, seconds):
+        with self._lock:
+            self._requests[route, method, status] += 1
+            histogram = self._request_seconds.get((route, method))
+            if histogram is None:
+                histogram = self._request_seconds[route, method] = _Histogram(REQUEST_BUCKETS)
+            histogram.observe(seconds)
+
+    def observe_query(self, route, sql, seconds):
+        with self._lock:
+            histogram = self._query_seconds.get(route)
+            if histogram is None:
+                histogram = self._query_seconds[route] = _Histogram(QUERY_BUCKETS)
+            histogram.observe(seconds)
+            if seconds < self.slow_query_seconds:
+                return
+            self._slow_queries[route] += 1
+            key = (route, normalize_sql(sql))
+            count, worst = self._slow_samples.pop(key, (0, 0.0))
+            self._slow_samples[key] = (count + 1, max(worst, seconds))
+            if len(self._slow_samples) > self.slow_query_samples:
+                self._slow_samples.popitem(last=False)
+
+    def render(self):
+        """Return every metric in the Prometheus text exposition format."""
+        p = self.prefix
+        with self._lock:
+            lines = [
+                f"# HELP {p}_http_requests_total Requests handled, by route, method and status.",
+                f"# TYPE {p}_http_requests_total counter",
+            ]
+            for (route, method, status), count in sorted(self._requests.items()):
+                lines.append(f"{p}_http_requests_total{_labels(route=route, method=method, status=status)} {count}")
+
+            lines += [
+                f"# HELP {p}_http_request_duration_seconds Time to handle a request, including any streamed body.",
+                f"# TYPE {p}_http_request_duration_seconds histogram",
+            ]
+            for (route, method), histogram in sorted(self._request_seconds.items()):
+                lines.extend(histogram.lines(f"{p}_http_request_duration_seconds", route=route, method=method))
+
+            lines += [
+                f"# HELP {p}_db_query_duration_seconds Time spent in database statements, by route.",
+                f"# TYPE {p}_db_query_duration_seconds histogram",
+            ]
+            for route, histogram in sorted(self._query_seconds.items()):
+                lines.extend(histogram.lines(f"{p}_db_query_duration_seconds", route=route))
+
+            lines += [
+                f"# HELP {p}_db_slow_queries_total Statements slower than {self.slow_query_seconds}s, by route.",
+                f"# TYPE {p}_db_slow_queries_total counter",
+            ]
+            for route, count in sorted(self._slow_queries.items()):
+                lines.append(f"{p}_db_slow_queries_total{_labels(route=route)} {count}")
+
+            lines += [
+                f"# HELP {p}_db_slow_query_max_seconds Worst duration of each sampled slow statement.",
+                f"# TYPE {p}_db_slow_query_max_seconds gauge",
+            ]
+            for (route, sql), (_, worst) in self._slow_samples.items():
+                lines.append(f"{p}_db_slow_query_max_seconds{_labels(route=route, statement=sql)} {worst:.6f}")
+            lines += [
+                f"# HELP {p}_db_slow_query_calls Times each sampled statement ran slower than the threshold.",
+                f"# TYPE {p}_db_slow_query_calls gauge",
+            ]
+            for (route, sql), (count, _) in self._slow_samples.items():
+                lines.append(f"{p}_db_slow_query_calls{_labels(route=route, statement=sql)} {count}")
+        return "\n".join(lines) + "\n"
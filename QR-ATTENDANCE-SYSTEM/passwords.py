@@ -0,0 +1,79 @@
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+class HasherBusy(Exception):
+    """Raised when every hashing slot stays taken for longer than the caller will wait."""
+
+
+class PasswordHasher:
+    """Password hashing and verification in a bounded process pool.
+
+    At most max_pending hashes may be queued or running at once; callers
+    wait up to wait seconds for a slot and then get HasherBusy, so a login
+    storm is turned away early instead of piling up behind the CPU.
+    With workers=0 hashing runs inline in the calling thread.
+    """
+
+    def __init__(self, method="pbkdf2:sha256:600000", workers=None, max_pending=64, wait=5.0):
+        # werkzeug fills in defaults (e.g. scrypt's cost parameters), so compare
+        # stored hashes against the method string it actually writes
+        self.method = method
+        self.policy = generate_password_hash("", method).split("$", 1)[0]
+        self.workers = workers
+        self.wait = wait
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._pool = None
+        self.completed = 0
+        self.rejected = 0
+        self.pending = 0
+
+    def _run(self, function, *args):
+        if not self._slots.acquire(timeout=self.wait):
+            with self._lock:
+                self.rejected += 1
+            raise HasherBusy()
+        with self._lock:
+            self.pending += 1
+        try:
+            if self.workers == 0:
+                return function(*args)
+            if self._pool is None:
+                with self._lock:
+                    if self._pool is None:
+                        self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            return self._pool.submit(function, *args).result()
+        finally:
+            with self._lock:
+                self.pending -= 1
+                self.completed += 1
+            self._slots.release()
+
+    def hash(self, password):
+        """Return a hash of password under the current policy."""
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, pwhash, password):
+        """Return True if password matches pwhash."""
+        return self._run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        """Return True if pwhash was made under a different policy than the current one."""
+        return pwhash.split("$", 1)[0] != self.policy
+
+    def stats(self):
+        with self._lock:
+            return {
+                "method": self.policy,
+                "workers": self.workers,
+                "pending": self.pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,82 @@
+import hashlib
+import os
+import tempfile
+from io import BytesIO
+
+import qrcode
+import qrcode.image.svg
+
+from cache import LRUCache
+
+MIMETYPES = {"png": "image/png", "svg": "image/svg+xml"}
+
+
+def render_qr(data, fmt="png", box_size=10, border=4):
+    """Render data as a QR code and return the encoded image bytes."""
+    qr = qrcode.QRCode(box_size=box_size, border=border)
+    qr.add_data(data)
+    qr.make(fit=True)
+    buffer = BytesIO()
+    if fmt == "svg":
+        qr.make_image(image_factory=qrcode.image.svg.SvgPathImage).save(buffer)
+    else:
+        qr.make_image(fill_color="black", back_color="white").save(buffer)
+    return buffer.getvalue()
+
+
+class QRImageCache:
+    """Rendered QR images keyed by payload and output options.
+
+    Images are kept in an in-memory LRU and, when directory is set, also
+    written to disk so they survive restarts.
+    """
+
+    def __init__(self, maxsize=256, directory=None):
+        self.memory = LRUCache(maxsize=maxsize)
+        self.directory = directory
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def etag(data, fmt="png", box_size=10, border=4):
+        """Return a stable entity tag for one rendering of data."""
+        key = f"{fmt}:{box_size}:{border}:{data}"
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+
+    def get(self, data, fmt="png", box_size=10, border=4):
+        """Return (image bytes, etag), rendering only on a cache miss."""
+        etag = self.etag(data, fmt, box_size, border)
+        image = self.memory.get(etag)
+        if image is not None:
+            return image, etag
+
+        path = os.path.join(self.directory, f"{etag}.{fmt}") if self.directory else None
+        if path and os.path.exists(path):
+            with open(path, "rb") as f:
+                image = f.read()
+        else:
+            image = render_qr(data, fmt, box_size, border)
+            if path:
+                self._store(path, image)
+
+        self.memory.set(etag, image)
+        return image, etag
+
+    def _store(self, path, image):
+        # Write to a unique temporary name first so readers never see a partial
+        # file and threads rendering the same payload don't share one
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(image)
+            os.replace(tmp, path)
+        except OSError:
+            # Whoever wrote the file first wins; the image in hand is just as good
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            if not os.path.exists(path):
+                raise
+
+    def stats(self):
+        """Return hit/miss counters of the in-memory tier."""
+        return self.memory.stats()
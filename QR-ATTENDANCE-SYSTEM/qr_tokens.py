@@ -0,0 +1,66 @@
+import base64
+import hashlib
+import hmac
+import struct
+import time
+
+# version, session id, expiry (unix seconds)
+_BODY = struct.Struct(">BII")
+_VERSION = 1
+_MAC_SIZE = 8
+
+
+def is_token(qr_data):
+    """Tell a signed token apart from a legacy date,semester,slot,subject,type payload."""
+    return isinstance(qr_data, str) and "," not in qr_data
+
+
+class QRTokenSigner:
+    """Issues and checks short HMAC-signed QR tokens carrying a session id.
+
+    A token is 17 bytes (body plus a truncated HMAC-SHA256) in unpadded
+    base32, 28 characters drawn from the QR alphanumeric set, so codes stay
+    at low versions. Expiries are rounded down to the rotation window (a
+    minute when not rotating), so every token issued for a session within a
+    window is identical and its rendered image can be cached.
+    """
+
+    def __init__(self, secret, ttl=86400, rotate=0):
+        if isinstance(secret, str):
+            secret = secret.encode()
+        self.secret = secret
+        self.ttl = ttl
+        self.rotate = rotate
+
+    def _mac(self, body):
+        return hmac.new(self.secret, body, hashlib.sha256).digest()[:_MAC_SIZE]
+
+    def issue(self, session_id, now=None, until=None):
+        """Return a token for session_id valid for ttl seconds from the start of this window.
+
+        When not rotating, a token also stays valid until the unix time until,
+        so codes printed ahead of time still scan when their session runs.
+        """
+        now = int(time.time() if now is None else now)
+        step = self.rotate or 60
+        expires = now - now % step + self.ttl
+        if until is not None and not self.rotate:
+            expires = max(expires, int(until))
+        body = _BODY.pack(_VERSION, session_id, expires)
+        return base64.b32encode(body + self._mac(body)).decode().rstrip("=")
+
+    def verify(self, token, now=None):
+        """Return the session id of a valid, unexpired token, or None."""
+        try:
+            raw = base64.b32decode(token.upper() + "=" * (-len(token) % 8))
+        except (ValueError, TypeError):
+            return None
+        if len(raw) != _BODY.size + _MAC_SIZE:
+            return None
+        body, mac = raw[:_BODY.size], raw[_BODY.size:]
+        if not hmac.compare_digest(mac, self._mac(body)):
+            return None
+        version, session_id, expires = _BODY.unpack(body)
+        if version != _VERSION or expires < (time.time() if now is None else now):
+            return None
+        return session_id
@@ -0,0 +1,17 @@
+import re
+
+# A full pass over one of the large tables, as opposed to "SCAN attendance USING COVERING INDEX ..."
+_FULL_SCAN = re.compile(r"^SCAN (?:\w+\.)?(attendance|sessions|users)(?: AS \w+)?$")
+
+
+def explain(db, sql, *args):
+    """Return the detail lines of SQLite's EXPLAIN QUERY PLAN for a statement."""
+    return [row["detail"] for row in db.execute(f"EXPLAIN QUERY PLAN {sql}", *args)]
+
+
+def problems(plan):
+    """Return the plan lines that read a large table in full or sort its rows in a temporary b-tree."""
+    return [
+        detail for detail in plan
+        if _FULL_SCAN.match(detail) or detail.startswith("USE TEMP B-TREE FOR ORDER BY")
+    ]
@@ -0,0 +1,217 @@
+"""Schema additions applied to class-attendance.db at startup.
+
+Migrations that reshape existing tables run once each, tracked by
+PRAGMA user_version. Every other statement here is idempotent so it is
+safe to run on each boot.
+"""
+
+# Department assigned to subjects created from free-text session subjects
+DEFAULT_DEPARTMENT = "General"
+
+TABLES = [
+    # Archived terms and the dates each archive file covers, see archive.py
+    """CREATE TABLE IF NOT EXISTS archives (
+           term TEXT PRIMARY KEY,
+           path TEXT NOT NULL,
+           date_from TEXT NOT NULL,
+           date_to TEXT NOT NULL,
+           sessions INTEGER NOT NULL,
+           attendance INTEGER NOT NULL,
+           archived_on TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+       )""",
+]
+
+INDEXES = [
+    # Resolves a scanned QR payload to its session in /scan_qr
+    """CREATE INDEX IF NOT EXISTS idx_sessions_lookup
+       ON sessions (date, semester, slot, subject_id, attendance_type)""",
+    # Covers the admin's session list, in keyset order
+    """CREATE INDEX IF NOT EXISTS idx_sessions_created_by_covering
+       ON sessions (created_by, date, id, semester, slot, subject_id, attendance_type)""",
+    # Covers a subject's sessions in /manage_attendance
+    """CREATE INDEX IF NOT EXISTS idx_sessions_subject
+       ON sessions (subject_id, date, slot)""",
+    # Covers date-range exports and the admin attendance list, both in (day, marked_on, id) order
+    """CREATE INDEX IF NOT EXISTS idx_attendance_day
+       ON attendance (day, marked_on, id, user_id, session_id)""",
+    # Covers attendance per session
+    """CREATE INDEX IF NOT EXISTS idx_attendance_session
+       ON attendance (session_id, user_id, marked_on)""",
+    # A student is marked at most once per session
+    """CREATE UNIQUE INDEX IF NOT EXISTS uq_attendance_user_session
+       ON attendance (user_id, session_id)""",
+]
+
+# Summary tables kept current by the triggers below. Counts are of distinct
+# (student, session) pairs, so a rescan does not count twice.
+SUMMARY_TABLES = {
+    "summary_student_subject": """
+        CREATE TABLE IF NOT EXISTS summary_student_subject (
+            user_id INTEGER NOT NULL,
+            subject_id INTEGER NOT NULL,
+            attended INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user_id, subject_id)
+        ) WITHOUT ROWID""",
+    "summary_subject_sessions": """
+        CREATE TABLE IF NOT EXISTS summary_subject_sessions (
+            subject_id INTEGER PRIMARY KEY,
+            sessions INTEGER NOT NULL DEFAULT 0
+        )""",
+    "summary_session_headcount": """
+        CREATE TABLE IF NOT EXISTS summary_session_headcount (
+            session_id INTEGER PRIMARY KEY,
+            headcount INTEGER NOT NULL DEFAULT 0
+        )""",
+}
+
+SUMMARY_INDEXES = [
+    """CREATE INDEX IF NOT EXISTS idx_summary_student_subject_subject
+       ON summary_student_subject (subject_id, user_id)""",
+]
+
+TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS trg_attendance_insert_summary
+       AFTER INSERT ON attendance
+       WHEN NOT EXISTS (
+           SELECT 1 FROM attendance
+           WHERE user_id = NEW.user_id AND session_id = NEW.session_id AND id != NEW.id
+       )
+       BEGIN
+           INSERT INTO summary_student_subject (user_id, subject_id, attended)
+           SELECT NEW.user_id, subject_id, 1 FROM sessions WHERE id = NEW.session_id
+           ON CONFLICT (user_id, subject_id) DO UPDATE SET attended = attended + 1;
+           INSERT INTO summary_session_headcount (session_id, headcount)
+           VALUES (NEW.session_id, 1)
+           ON CONFLICT (session_id) DO UPDATE SET headcount = headcount + 1;
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_attendance_delete_summary
+       AFTER DELETE ON attendance
+       WHEN NOT EXISTS (
+           SELECT 1 FROM attendance WHERE user_id = OLD.user_id AND session_id = OLD.session_id
+       )
+       BEGIN
+           UPDATE summary_student_subject SET attended = attended - 1
+           WHERE user_id = OLD.user_id
+             AND subject_id = (SELECT subject_id FROM sessions WHERE id = OLD.session_id);
+           UPDATE summary_session_headcount SET headcount = headcount - 1
+           WHERE session_id = OLD.session_id;
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_sessions_insert_summary
+       AFTER INSERT ON sessions
+       BEGIN
+           INSERT INTO summary_subject_sessions (subject_id, sessions)
+           VALUES (NEW.subject_id, 1)
+           ON CONFLICT (subject_id) DO UPDATE SET sessions = sessions + 1;
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_sessions_delete_summary
+       AFTER DELETE ON sessions
+       BEGIN
+           UPDATE summary_subject_sessions SET sessions = sessions - 1 WHERE subject_id = OLD.subject_id;
+       END""",
+]
+
+REBUILD = [
+    "DELETE FROM summary_student_subject",
+    "DELETE FROM summary_subject_sessions",
+    "DELETE FROM summary_session_headcount",
+    """INSERT INTO summary_student_subject (user_id, subject_id, attended)
+       SELECT attendance.user_id, sessions.subject_id, COUNT(DISTINCT attendance.session_id)
+       FROM attendance
+       JOIN sessions ON attendance.session_id = sessions.id
+       GROUP BY attendance.user_id, sessions.subject_id""",
+    """INSERT INTO summary_subject_sessions (subject_id, sessions)
+       SELECT subject_id, COUNT(*) FROM sessions GROUP BY subject_id""",
+    """INSERT INTO summary_session_headcount (session_id, headcount)
+       SELECT session_id, COUNT(DISTINCT user_id) FROM attendance GROUP BY session_id""",
+]
+
+
+def _normalize_subjects(db):
+    """Replace the free-text sessions.subject with a subject_id key into subjects."""
+    # Anything built on the text column is dropped here and recreated by ensure_schema
+    for statement in [
+        "DROP TRIGGER IF EXISTS trg_attendance_insert_summary",
+        "DROP TRIGGER IF EXISTS trg_attendance_delete_summary",
+        "DROP TRIGGER IF EXISTS trg_sessions_insert_summary",
+        "DROP TRIGGER IF EXISTS trg_sessions_delete_summary",
+        "DROP INDEX IF EXISTS idx_sessions_lookup",
+        "DROP TABLE IF EXISTS summary_student_subject",
+        "DROP TABLE IF EXISTS summary_subject_sessions",
+    ]:
+        db.execute(statement)
+
+    db.execute("INSERT OR IGNORE INTO departments (name) VALUES (?)", DEFAULT_DEPARTMENT)
+    db.execute("ALTER TABLE sessions ADD COLUMN subject_id INTEGER REFERENCES subjects(id)")
+    db.execute("""
+        INSERT OR IGNORE INTO subjects (name, department_id)
+        SELECT DISTINCT subject, (SELECT id FROM departments WHERE name = ?) FROM sessions
+    """, DEFAULT_DEPARTMENT)
+    db.execute("UPDATE sessions SET subject_id = (SELECT id FROM subjects WHERE subjects.name = sessions.subject)")
+    db.execute("ALTER TABLE sessions DROP COLUMN subject")
+
+
+def _unique_attendance(db):
+    """Collapse rescans to the first scan of each (student, session) and make the pair unique."""
+    db.execute("""
+        DELETE FROM attendance
+        WHERE id NOT IN (SELECT MIN(id) FROM attendance GROUP BY user_id, session_id)
+    """)
+    db.execute("DROP INDEX IF EXISTS idx_attendance_user_session")
+    db.execute("CREATE UNIQUE INDEX IF NOT EXISTS uq_attendance_user_session ON attendance (user_id, session_id)")
+
+
+def _attendance_day(db):
+    """Add a day column derived from marked_on, so date filters can use an index."""
+    # ALTER TABLE can only add virtual generated columns; idx_attendance_day stores the value
+    db.execute("ALTER TABLE attendance ADD COLUMN day TEXT GENERATED ALWAYS AS (DATE(marked_on)) VIRTUAL")
+    # Superseded by the covering indexes in INDEXES
+    db.execute("DROP INDEX IF EXISTS idx_attendance_marked_on")
+    db.execute("DROP INDEX IF EXISTS idx_sessions_created_by_date")
+
+
+# Applied in order; PRAGMA user_version records how many have run
+MIGRATIONS = [
+    _normalize_subjects,
+    _unique_attendance,
+    _attendance_day,
+]
+
+
+def migrate(db):
+    """Run every migration the database has not seen yet, each in its own transaction.
+
+    Workers starting together may race here, so the version is re-read under
+    the write lock and a migration another worker already applied is skipped.
+    """
+    version = db.execute("PRAGMA user_version")[0]["user_version"]
+    for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+        with db.transaction():
+            if db.execute("PRAGMA user_version")[0]["user_version"] >= number:
+                continue
+            migration(db)
+            db.execute(f"PRAGMA user_version = {number}")
+
+
+def rebuild_summaries(db):
+    """Recompute every summary table from attendance and sessions."""
+    with db.transaction():
+        for statement in REBUILD:
+            db.execute(statement)
+
+
+def ensure_schema(db):
+    """Apply pending migrations, then create any missing tables, indexes, summary tables and triggers."""
+    migrate(db)
+
+    for statement in TABLES + INDEXES:
+        db.execute(statement)
+
+    existing = {row["name"] for row in db.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    for statement in SUMMARY_TABLES.values():
+        db.execute(statement)
+    for statement in SUMMARY_INDEXES + TRIGGERS:
+        db.execute(statement)
+
+    # Backfill summaries the first time they are created on an existing database
+    if not existing.issuperset(SUMMARY_TABLES):
+        rebuild_summaries(db)
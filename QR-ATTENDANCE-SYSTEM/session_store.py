@@ -0,0 +1,144 @@
+import secrets
+import sqlite3
+import threading
+import time
+
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SecureCookieSessionInterface, SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+
+
+class CookieSessionInterface(SecureCookieSessionInterface):
+    """Signed-cookie sessions that skip Set-Cookie when the data did not change."""
+
+    def open_session(self, app, request):
+        session = super().open_session(app, request)
+        if session is not None:
+            # A serialized snapshot: flash() and friends mutate nested values in place
+            session.original = self.serializer.dumps(dict(session))
+        return session
+
+    def save_session(self, app, session, response):
+        # Reassigning a key to the value it already holds still marks the session modified
+        if session.modified and self.serializer.dumps(dict(session)) == getattr(session, "original", None):
+            session.modified = False
+        super().save_session(app, session, response)
+
+
+class SQLiteSession(CallbackDict, SessionMixin):
+    """Server-side session whose data lives in a row of the session store."""
+
+    def __init__(self, initial=None, sid=None, new=False, original=None, expires=0.0):
+        def on_update(self):
+            self.modified = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.original = original
+        self.expires = expires
+        self.modified = False
+
+
+class SQLiteSessionInterface(SessionInterface):
+    """Session store kept in a single SQLite file with expiry-based eviction.
+
+    Rows are only written when the serialized session differs from what was
+    loaded, or when more than half of its lifetime has elapsed. Expired rows
+    are pruned at most once every prune_interval seconds.
+    """
+
+    serializer = TaggedJSONSerializer()
+
+    def __init__(self, path, prune_interval=300):
+        self.path = path
+        self.prune_interval = prune_interval
+        self._local = threading.local()
+        self._last_prune = 0.0
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS session_store (
+                    sid TEXT PRIMARY KEY,
+                    data TEXT NOT NULL,
+                    expires REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_session_store_expires ON session_store (expires)")
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute("PRAGMA busy_timeout = 5000")
+        return conn
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            row = self._connect().execute(
+                "SELECT data, expires FROM session_store WHERE sid = ? AND expires > ?", (sid, time.time())
+            ).fetchone()
+            if row is not None:
+                return SQLiteSession(self.serializer.loads(row[0]), sid=sid, original=row[0], expires=row[1])
+        return SQLiteSession(sid=secrets.token_urlsafe(32), new=True)
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        conn = self._connect()
+        now = time.time()
+
+        if session.accessed:
+            response.vary.add("Cookie")
+
+        # Empty session: drop the row and the cookie
+        if not session:
+            if not session.new:
+                with conn:
+                    conn.execute("DELETE FROM session_store WHERE sid = ?", (session.sid,))
+            if session.modified:
+                response.delete_cookie(name, domain=domain, path=path)
+            return
+
+        lifetime = app.permanent_session_lifetime.total_seconds()
+        data = self.serializer.dumps(dict(session))
+        if data == session.original and session.expires - now > lifetime / 2:
+            return
+
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO session_store (sid, data, expires) VALUES (?, ?, ?)",
+                (session.sid, data, now + lifetime),
+            )
+            if now - self._last_prune > self.prune_interval:
+                self._last_prune = now
+                conn.execute("DELETE FROM session_store WHERE expires <= ?", (now,))
+
+        if session.new or session.permanent:
+            response.set_cookie(
+                name,
+                session.sid,
+                expires=self.get_expiration_time(app, session),
+                httponly=self.get_cookie_httponly(app),
+                domain=domain,
+                path=path,
+                secure=self.get_cookie_secure(app),
+                samesite=self.get_cookie_samesite(app),
+            )
+
+
+def init_session(app):
+    """Install the session interface selected by SESSION_BACKEND ("cookie" or "sqlite")."""
+    backend = app.config.get("SESSION_BACKEND", "cookie")
+    if backend == "cookie":
+        app.session_interface = CookieSessionInterface()
+    elif backend == "sqlite":
+        app.session_interface = SQLiteSessionInterface(
+            app.config.get("SESSION_SQLITE_PATH", "flask_session.db"),
+            prune_interval=app.config.get("SESSION_PRUNE_INTERVAL", 300),
+        )
+    else:
+        raise ValueError(f"Unknown SESSION_BACKEND: {backend!r}")
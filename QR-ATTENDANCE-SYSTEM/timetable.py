@@ -0,0 +1,113 @@
+import csv
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, wait
+from datetime import date as Date
+from io import TextIOWrapper
+
+from qr_images import render_qr
+
+ATTENDANCE_TYPES = ("class", "lab")
+
+# DictReader key for values past the header's last column
+EXTRA_COLUMNS = "\0extra"
+
+
+def parse_timetable(stream, max_rows=5000):
+    """Read and validate a timetable CSV of date, semester, slot, subject, type.
+
+    Returns (rows, errors) where rows are (date, semester, slot, subject,
+    attendance_type) tuples and errors are human-readable messages with the
+    CSV line number.
+
+    Raises UnicodeDecodeError for files that are not UTF-8 and csv.Error for
+    malformed CSV.
+    """
+    reader = csv.DictReader(TextIOWrapper(stream, encoding="utf-8-sig", newline=""), restkey=EXTRA_COLUMNS)
+    fields = {name.strip().lower() for name in reader.fieldnames or []}
+    missing = {"date", "semester", "slot", "subject"} - fields
+    if missing or not fields & {"type", "attendance_type"}:
+        return [], ["CSV header must have date, semester, slot, subject and type columns."]
+
+    rows = []
+    errors = []
+    for line, raw in enumerate(reader, start=2):
+        if len(rows) >= max_rows:
+            errors.append(f"Timetable has more than {max_rows} rows.")
+            break
+        if EXTRA_COLUMNS in raw:
+            errors.append(f"Line {line}: more columns than the header; quote values that contain commas.")
+            continue
+        row = {key.strip().lower(): (value or "").strip() for key, value in raw.items()}
+        attendance_type = (row.get("type") or row.get("attendance_type") or "").lower()
+        try:
+            day = Date.fromisoformat(row["date"]).isoformat()
+        except ValueError:
+            errors.append(f"Line {line}: invalid date {row['date']!r}.")
+            continue
+        if not row["semester"].isdigit() or int(row["semester"]) <= 0:
+            errors.append(f"Line {line}: semester must be a positive number.")
+            continue
+        if not row["slot"].isdigit() or int(row["slot"]) <= 0:
+            errors.append(f"Line {line}: slot must be a positive number.")
+            continue
+        if not row["subject"] or "," in row["subject"]:
+            errors.append(f"Line {line}: subject is required and may not contain commas.")
+            continue
+        if attendance_type not in ATTENDANCE_TYPES:
+            errors.append(f"Line {line}: type must be one of {', '.join(ATTENDANCE_TYPES)}.")
+            continue
+        rows.append((day, int(row["semester"]), int(row["slot"]), row["subject"], attendance_type))
+    return rows, errors
+
+
+class _StreamBuffer:
+    """Write-only sink that hands zipfile output back in chunks."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_qr_zip(entries, executor, fmt="png", box_size=10, window=8):
+    """Render (filename, payload) entries on executor and yield a ZIP archive.
+
+    At most window renders are in flight at once, and each image is added to
+    the archive and its bytes yielded as soon as its render finishes, so
+    neither the rendered images nor the archive are ever held in memory.
+    """
+    buffer = _StreamBuffer()
+    entries = iter(entries)
+    in_flight = {}
+    # PNGs are already compressed; SVG text still deflates well
+    compression = zipfile.ZIP_DEFLATED if fmt == "svg" else zipfile.ZIP_STORED
+    try:
+        with zipfile.ZipFile(buffer, mode="w", compression=compression) as archive:
+            while True:
+                while len(in_flight) < window:
+                    entry = next(entries, None)
+                    if entry is None:
+                        break
+                    filename, payload = entry
+                    in_flight[executor.submit(render_qr, payload, fmt, box_size)] = filename
+                if not in_flight:
+                    break
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    archive.writestr(in_flight.pop(future), future.result())
+                    yield buffer.pop()
+        yield buffer.pop()
+    finally:
+        # The client went away mid-download; don't render the rest
+        for future in in_flight:
+            future.cancel()
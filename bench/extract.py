@@ -0,0 +1,179 @@
+"""Golden-output check and micro-benchmark for card_valut's field extraction.
+
+    python bench/extract.py
+    python bench/extract.py --texts 20000 --repeat 5
+
+Builds a corpus of OCR-like card texts (synthetic cards in varied layouts,
+with noise lines, missing fields and several phone formats, plus a few
+hand-written edge cases) and checks that extractor.extract_fields returns
+exactly what the original per-line extraction loop returned for every one
+of them. The original loop's whole-text phone fallback was double-escaped
+and failed to compile, so the baseline here uses it as intended. Exits
+non-zero on any mismatch; otherwise prints texts per second for both.
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from datetime import datetime
+
+import harness
+import seed
+from run import CARD_DIR, ROOT
+
+sys.path.insert(0, CARD_DIR)
+import extractor  # noqa: E402
+
+
+def baseline_extract_fields(text):
+    """The extraction loop /ocr ran before extractor.py, kept as the golden reference."""
+    # Extract information using regex patterns
+    patterns = {
+        'name': r'^[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*$',
+        'company': r'(?i)(?<=Company:)[\w\s]+',
+        'job_title': r'(?i)(?<=Title:)[\w\s]+',
+        'card_number': r'\b\d{8,16}\b',
+        'email': r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}',
+        'phone_number': r'(?:\+\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}',
+        'website': r'(?:http[s]?://)?(?:www\.)?[a-zA-Z0-9-]+(?:\.[a-zA-Z]{2,})+',
+        'address': r'\d+\s+[\w\s.,]+(?:Street|St|Avenue|Ave|Road|Rd|Boulevard|Blvd)[\w\s.,]*',
+    }
+
+    extracted_info = {}
+    lines = text.split('\n')
+
+    # Process each line for different types of information
+    for line in lines:
+        line = line.strip()
+        if line:
+            for key, pattern in patterns.items():
+                if key not in extracted_info:
+                    match = re.search(pattern, line, re.IGNORECASE)
+                    if match:
+                        extracted_info[key] = match.group(0)
+
+    # If phone_number not found, try to extract from the whole text
+    if not extracted_info.get('phone_number'):
+        phone_matches = re.findall(r'(?:\+?\d{1,3}[\s.-]?)?(?:\(?\d{2,4}\)?[\s.-]?)?\d{3,4}[\s.-]?\d{3,4}', text)
+        # Filter out matches that are too short or too long
+        phone_matches = [p for p in phone_matches if 7 <= len(re.sub(r'\D', '', p)) <= 15]
+        if phone_matches:
+            extracted_info['phone_number'] = phone_matches[0]
+
+    # Ensure all required fields for DB insert are present (use None if missing)
+    for field in ['name', 'company', 'job_title', 'card_number', 'email', 'phone_number', 'website', 'address']:
+        if field not in extracted_info:
+            extracted_info[field] = None
+    return extracted_info
+
+
+EDGE_CASES = [
+    "",
+    "\n\n   \n",
+    "JANE DOE",
+    "jane doe\nCOMPANY: ACME CORP\ntitle: cto",
+    "Company:\nTitle:",
+    "Dr. Jane Doe\nCEO & Founder",
+    "Phone: (042) 3575-1234\nFax: 042 3575 1235",
+    "Tel 0300-1234567",
+    "+1 (555) 123-4567 ext. 89",
+    "Card 12345678901234567890",
+    "ID 1234567\n12345678",
+    "jane.doe+cards@mail.acme.co.uk\nwww.acme.co.uk",
+    "https://acme.example/contact",
+    "12 Mall Road, Lahore\n44 Ferozepur Rd, Lahore\n7 5th Avenue",
+    "Ünïcödé Nämé\nJosé Álvarez\nمحمد علی\n٠٣٠٠١٢٣٤٥٦٧",
+    "a.b\n1.2.3.4\n...\n@@@",
+    "Name Only\n\n\n",
+    "Office 3rd floor\nSuite 400 Blue Area St",
+]
+
+
+def corpus(size, seed_value):
+    """Synthetic OCR output: seed's cards in shuffled layouts with noise, then EDGE_CASES."""
+    rng = random.Random(seed_value)
+    phone_formats = [
+        lambda: f"+92 300 {rng.randint(1000000, 9999999)}",
+        lambda: f"0300-{rng.randint(1000000, 9999999)}",
+        lambda: f"(042) {rng.randint(100, 999)}-{rng.randint(1000, 9999)}",
+        lambda: f"Tel: +44 20 {rng.randint(1000, 9999)} {rng.randint(1000, 9999)}",
+        lambda: f"{rng.randint(100, 999)}.{rng.randint(100, 999)}.{rng.randint(1000, 9999)}",
+    ]
+    noise = [
+        lambda: "".join(rng.choice("|/\\_-~.,:;'`") for _ in range(rng.randint(1, 6))),
+        lambda: f"Ref {rng.randint(1, 99999)}",
+        lambda: f"{rng.randint(10000000, 9999999999)}",
+        lambda: "www." + rng.choice(["acme", "globex", "initech"]) + ".example",
+        lambda: rng.choice(["Best regards", "Thank you", "LINKEDIN", "Follow us"]),
+    ]
+    texts = []
+    for n in range(size):
+        fields = seed.card_fields(n, seed_value)
+        lines = [
+            fields["name"] if rng.random() < 0.8 else fields["name"].upper(),
+            f"Title: {fields['job_title']}" if rng.random() < 0.7 else fields["job_title"],
+            f"Company: {fields['company']}" if rng.random() < 0.7 else fields["company"],
+            fields["email"],
+            fields["address"],
+        ]
+        if rng.random() < 0.8:
+            lines.append(rng.choice(phone_formats)())
+        lines += [rng.choice(noise)() for _ in range(rng.randint(0, 4))]
+        rng.shuffle(lines)
+        texts.append("\n".join(" " * rng.randint(0, 2) + line for line in lines) + "\n" * rng.randint(0, 2))
+    return texts + EDGE_CASES
+
+
+def per_second(function, texts, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(texts)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return round(len(texts) / best, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--texts", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per implementation (best is kept)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="JSON results path (default bench/results/extract-<timestamp>.json)")
+    args = parser.parse_args()
+
+    output = args.output or os.path.join(ROOT, "bench", "results", f"extract-{datetime.now():%Y%m%d-%H%M%S}.json")
+    output = os.path.abspath(output)
+    texts = corpus(args.texts, args.seed)
+
+    mismatches = []
+    for text in texts:
+        expected, actual = baseline_extract_fields(text), extractor.extract_fields(text)
+        if expected != actual:
+            mismatches.append({"text": text, "expected": expected, "actual": actual})
+    print(f"Golden outputs: {len(texts) - len(mismatches)}/{len(texts)} texts match the baseline")
+    for mismatch in mismatches[:10]:
+        print(f"  MISMATCH {mismatch['text']!r}\n    expected {mismatch['expected']}\n    actual   {mismatch['actual']}")
+
+    baseline = per_second(lambda texts: [baseline_extract_fields(text) for text in texts], texts, args.repeat)
+    compiled = per_second(extractor.extract_many, texts, args.repeat)
+    print(f"\n{'implementation':<16} {'texts/s':>10}")
+    print(f"{'baseline':<16} {baseline:>10}")
+    print(f"{'extractor':<16} {compiled:>10}")
+    print(f"speedup {compiled / baseline:.2f}x over {len(texts)} texts")
+
+    results = [
+        {"implementation": "baseline", "texts_per_second": baseline},
+        {"implementation": "extractor", "texts_per_second": compiled},
+    ]
+    harness.save(output, results, vars(args), [f"{len(mismatches)} golden-output mismatches"])
+    print(f"\nResults written to {output}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Timing and reporting helpers shared by the benchmark scenarios."""
+
+import json
+import math
+import os
+import platform
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of an already sorted list."""
+    if not values:
+        return None
+    rank = max(math.ceil(p / 100 * len(values)), 1)
+    return values[rank - 1]
+
+
+def run(app, scenario, route, setup, call, requests=200, concurrency=8):
+    """Drive call(state) requests times from concurrency threads and summarize the timings.
+
+    setup() is run once per thread before the clock starts and returns the
+    state (usually a logged-in test client) that thread passes to call().
+    call() returns True when the response was the one expected.
+    """
+    states = [setup() for _ in range(concurrency)]
+    lock = threading.Lock()
+    remaining = [requests]
+    latencies = []
+    errors = [0]
+
+    def worker(state):
+        timings = []
+        failed = 0
+        while True:
+            with lock:
+                if remaining[0] == 0:
+                    break
+                remaining[0] -= 1
+            start = time.perf_counter()
+            try:
+                ok = call(state)
+            except Exception:
+                ok = False
+            timings.append(time.perf_counter() - start)
+            failed += not ok
+        with lock:
+            latencies.extend(timings)
+            errors[0] += failed
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for future in [executor.submit(worker, state) for state in states]:
+            future.result()
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    ms = lambda seconds: round(seconds * 1000, 3) if seconds is not None else None
+    return {
+        "app": app,
+        "scenario": scenario,
+        "route": route,
+        "requests": len(latencies),
+        "errors": errors[0],
+        "concurrency": concurrency,
+        "seconds": round(wall, 3),
+        "rps": round(len(latencies) / wall, 1) if wall else None,
+        "mean_ms": ms(sum(latencies) / len(latencies)) if latencies else None,
+        "p50_ms": ms(percentile(latencies, 50)),
+        "p95_ms": ms(percentile(latencies, 95)),
+        "p99_ms": ms(percentile(latencies, 99)),
+        "max_ms": ms(latencies[-1]) if latencies else None,
+    }
+
+
+def print_table(results):
+    """Print one line per scenario."""
+    header = f"{'scenario':<22} {'route':<40} {'reqs':>6} {'err':>5} {'rps':>8} {'p50':>9} {'p95':>9} {'p99':>9}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(f"{r['app'] + '/' + r['scenario']:<22} {r['route']:<40} {r['requests']:>6} {r['errors']:>5} "
+              f"{r['rps'] or 0:>8} {r['p50_ms'] or 0:>9} {r['p95_ms'] or 0:>9} {r['p99_ms'] or 0:>9}")
+
+
+def save(path, results, config, notes):
+    """Write results with enough context to compare runs across commits."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({
+            "started": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "config": config,
+            "notes": notes,
+            "results": results,
+        }, f, indent=2)
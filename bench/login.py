@@ -0,0 +1,74 @@
+"""Logins per second under concurrency, hashing inline and in the process pool.
+
+    python bench/login.py
+    python bench/login.py --levels 1,4,16,64 --requests 400
+
+Runs the login storm at each concurrency level twice: once with password
+checks inline in the request thread (PASSWORD_HASH_WORKERS=0) and once in
+the app's bounded process pool. Logins turned away with a 503 count as
+errors. Results are printed and saved as JSON like bench/run.py.
+"""
+
+import argparse
+import os
+import random
+import shutil
+import tempfile
+from datetime import datetime
+
+import harness
+import seed
+from run import ROOT, load_qr, working_directory
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=200, help="logins per run")
+    parser.add_argument("--levels", default="1,2,4,8,16", help="comma-separated concurrency levels")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="hashing processes for the pool runs")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="JSON results path (default bench/results/login-<timestamp>.json)")
+    args = parser.parse_args()
+
+    output = args.output or os.path.join(ROOT, "bench", "results", f"login-{datetime.now():%Y%m%d-%H%M%S}.json")
+    output = os.path.abspath(output)
+    levels = [int(level) for level in args.levels.split(",")]
+    rng = random.Random(args.seed)
+    results = []
+
+    workdir = tempfile.mkdtemp(prefix="bench-login-")
+    try:
+        with working_directory(workdir):
+            qr, _, _ = load_qr(workdir, args.users, 1, 0, args.seed)
+            hasher_class = type(qr.password_hasher)
+            config = qr.app.config
+
+            def call(client):
+                n = rng.randrange(args.users)
+                response = client.post("/login", data={"email": seed.bench_email(n), "password": seed.PASSWORD})
+                return response.status_code == 302
+
+            for mode, workers in [("inline", 0), ("pool", args.workers)]:
+                qr.password_hasher.shutdown()
+                qr.password_hasher = hasher_class(
+                    method=config["PASSWORD_HASH_METHOD"], workers=workers,
+                    max_pending=config["PASSWORD_HASH_MAX_PENDING"], wait=config["PASSWORD_HASH_WAIT"],
+                )
+                for level in levels:
+                    print(f"Running {mode} at concurrency {level} ...", flush=True)
+                    results.append(harness.run("qr", f"login_{mode}_c{level}", "POST /login", qr.app.test_client, call,
+                                               requests=args.requests, concurrency=level))
+            qr.password_hasher.shutdown()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print()
+    harness.print_table(results)
+    notes = [f"{args.users} users, hash method {config['PASSWORD_HASH_METHOD']}, pool of {args.workers} processes"]
+    harness.save(output, results, vars(args), notes)
+    print(f"\nResults written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+"""Load-test both Flask apps through their WSGI entry points.
+
+Each app is loaded from the repository against a temporary, freshly seeded
+copy of its database and driven concurrently with Flask test clients:
+
+    python bench/run.py                          # both apps, default volumes
+    python bench/run.py --app qr --attendance 3000000 --concurrency 16
+    python bench/run.py --scenario scan_burst --scenario csv_export
+
+Per-route p50/p95/p99 latency and requests per second are printed and
+saved as JSON (bench/results/ by default) for comparison across commits.
+Environment variables the apps read at import time, such as
+ATTENDANCE_WRITE_BEHIND=1, apply to the run.
+"""
+
+import argparse
+import importlib.util
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+from contextlib import contextmanager, redirect_stdout
+from datetime import date, datetime, timedelta
+from io import BytesIO
+
+import harness
+import seed
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+QR_DIR = os.path.join(ROOT, "QR-ATTENDANCE-SYSTEM")
+CARD_DIR = os.path.join(ROOT, "card_valut")
+
+# scanned_at values offline scanners send, and the UTC marked_on each must be stored as
+SCANNED_AT_CASES = [
+    ("2024-03-05T09:15:00", "2024-03-05 09:15:00"),
+    ("2024-03-05 09:15:00", "2024-03-05 09:15:00"),
+    ("2024-03-05T09:15:00Z", "2024-03-05 09:15:00"),
+    ("2024-03-05T09:15:00.250Z", "2024-03-05 09:15:00"),
+    ("2024-03-05T14:15:00+05:00", "2024-03-05 09:15:00"),
+    ("2024-03-05T01:15:00-08:00", "2024-03-05 09:15:00"),
+    ("2024-03-06T00:30:00+05:30", "2024-03-05 19:00:00"),
+]
+
+
+@contextmanager
+def working_directory(path):
+    # Both apps open their databases by relative path
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def load_app(name, path):
+    """Import an app.py under a unique module name so both apps can be loaded at once."""
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def logged_in(app, user_id):
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session["user_id"] = user_id
+    return client
+
+
+def load_qr(workdir, users, sessions, attendance, seed_value):
+    """Load the attendance app against a seeded copy of its database in workdir.
+
+    Returns the app module and the ids of the seeded users and sessions.
+    """
+    shutil.copy(os.path.join(QR_DIR, "class-attendance.db"), workdir)
+    sys.path.insert(0, QR_DIR)
+    qr = load_app("qr_app", os.path.join(QR_DIR, "app.py"))
+    schema = sys.modules["schema"]
+
+    user_ids, session_ids = seed.seed_attendance(
+        "class-attendance.db", users=users, sessions=sessions, attendance=attendance, seed=seed_value,
+        password_method=qr.app.config["PASSWORD_HASH_METHOD"],
+    )
+    schema.ensure_schema(qr.db)
+    schema.rebuild_summaries(qr.db)
+    qr.subject_catalog.invalidate()
+    return qr, user_ids, session_ids
+
+
+def qr_scenarios(args, workdir, notes):
+    """Seed the attendance database, then run the QR attendance scenarios."""
+    qr, user_ids, session_ids = load_qr(workdir, args.users, args.sessions, args.attendance, args.seed)
+    admin_id = user_ids[0]
+
+    payloads = [
+        f"{row['date']},{row['semester']},{row['slot']},{row['subject']},{row['attendance_type']}"
+        for row in qr.db.execute("""
+            SELECT sessions.date, sessions.semester, sessions.slot, subjects.name AS subject, sessions.attendance_type
+            FROM sessions JOIN subjects ON subjects.id = sessions.subject_id
+            WHERE sessions.id >= ?
+        """, session_ids[0])
+    ]
+    rng = random.Random(args.seed)
+    first_day = date(2024, 1, 1)
+
+    # Offline scans must land at the right UTC time whatever offset the scanner used
+    for value, expected in SCANNED_AT_CASES:
+        stored = qr.parse_scanned_at(value)
+        if stored != expected:
+            sys.exit(f"scanned_at {value!r} stored as {stored!r}, expected {expected!r}")
+
+    def login_storm():
+        def call(client):
+            n = rng.randrange(args.users)
+            response = client.post("/login", data={"email": seed.bench_email(n), "password": seed.PASSWORD})
+            return response.status_code == 302
+        return "login_storm", "POST /login", qr.app.test_client, call
+
+    def scan_burst():
+        def call(client):
+            response = client.post("/scan_qr", data={"qr_data": rng.choice(payloads)})
+            return response.status_code == 302
+        return "scan_burst", "POST /scan_qr", lambda: logged_in(qr.app, rng.choice(user_ids)), call
+
+    def scan_batch():
+        def call(client):
+            records = [
+                {"user_id": rng.choice(user_ids), "qr_data": rng.choice(payloads),
+                 "scanned_at": rng.choice(SCANNED_AT_CASES)[0]}
+                for _ in range(args.batch_size)
+            ]
+            response = client.post("/scan_qr/batch", json=records)
+            return response.status_code == 200 and all(
+                result.get("error") != "Invalid scanned_at timestamp." for result in response.get_json()["results"]
+            )
+        return "scan_batch", f"POST /scan_qr/batch ({args.batch_size})", lambda: logged_in(qr.app, admin_id), call
+
+    def csv_export():
+        def call(client):
+            day = first_day + timedelta(days=rng.randrange(358))
+            response = client.get("/download_filtered_attendance_csv", query_string={
+                "date_from": day.isoformat(), "date_to": (day + timedelta(days=6)).isoformat(),
+            })
+            response.get_data()
+            return response.status_code == 200
+        return "csv_export", "GET /download_filtered_attendance_csv (7d)", lambda: logged_in(qr.app, admin_id), call
+
+    def admin_attendance():
+        def call(client):
+            response = client.get("/admins/attendance", query_string={"limit": 50})
+            return response.status_code == 200
+        return "admin_attendance", "GET /admins/attendance", lambda: logged_in(qr.app, admin_id), call
+
+    notes.append(f"qr: {args.users} users, {args.sessions} sessions, {args.attendance} attendance rows")
+    return [login_storm, scan_burst, scan_batch, csv_export, admin_attendance]
+
+
+def card_scenarios(args, workdir, notes):
+    """Seed the business card database, then run the card vault scenarios."""
+    sys.path.insert(0, CARD_DIR)
+    try:
+        cards = load_app("card_app", os.path.join(CARD_DIR, "app.py"))
+    except ImportError as e:
+        notes.append(f"cards: skipped, {e}")
+        return []
+    seed.seed_cards("cards.db", cards=args.cards, seed=args.seed)
+    rng = random.Random(args.seed)
+
+    def list_cards():
+        def call(client):
+            return client.get("/cards").status_code == 200
+        return "list_cards", "GET /cards", cards.app.test_client, call
+
+    def list_cards_unchanged():
+        # A client revalidating its copy of the first page: answered 304 without running the listing
+        etag = cards.app.test_client().get("/cards").headers["ETag"]
+
+        def call(client):
+            return client.get("/cards", headers={"If-None-Match": etag}).status_code == 304
+        return "list_cards_304", "GET /cards (If-None-Match)", cards.app.test_client, call
+
+    def search_cards():
+        # A name prefix, as typed into the search box
+        def call(client):
+            prefix = rng.choice(seed.FIRST_NAMES)[:rng.randint(2, 5)]
+            return client.get("/cards/search", query_string={"q": prefix}).status_code == 200
+        return "search_cards", "GET /cards/search", cards.app.test_client, call
+
+    def get_card():
+        def call(client):
+            return client.get(f"/cards/{rng.randint(1, args.cards)}").status_code == 200
+        return "get_card", "GET /cards/<id>", cards.app.test_client, call
+
+    notes.append(f"cards: {args.cards} cards")
+    scenarios = [list_cards, list_cards_unchanged, search_cards, get_card]
+
+    try:
+        sys.modules["card_ocr"].pytesseract.get_tesseract_version()
+    except Exception as e:
+        notes.append(f"cards: ocr_upload skipped, tesseract unavailable ({e.__class__.__name__})")
+        return scenarios
+
+    images = [seed.card_image(n, seed=args.seed) for n in range(16)]
+
+    def upload(client, query):
+        # Queue the image, then poll its job until the OCR pool has read it; a cache hit answers at once
+        response = client.post(f"/ocr{query}", data={"image": (BytesIO(rng.choice(images)), "card.png")})
+        while response.status_code == 429:
+            time.sleep(0.05)
+            response = client.post(f"/ocr{query}", data={"image": (BytesIO(rng.choice(images)), "card.png")})
+        if response.status_code == 200:
+            return True
+        if response.status_code != 202:
+            return False
+        url = response.get_json()["url"]
+        while True:
+            job = client.get(url).get_json()
+            if job["status"] in ("done", "failed"):
+                return job["status"] == "done"
+            time.sleep(0.01)
+
+    def ocr_upload():
+        # The 16 images repeat, so skip the OCR cache to measure tesseract itself
+        return "ocr_upload", "POST /ocr + GET /ocr/jobs/<id>", cards.app.test_client, lambda client: upload(client, "?cache=0")
+
+    def ocr_upload_cached():
+        return "ocr_upload_cached", "POST /ocr (repeat images)", cards.app.test_client, lambda client: upload(client, "")
+
+    def ocr_bulk():
+        # One ZIP of several cards per request, read in parallel and saved together
+        archive = BytesIO()
+        with zipfile.ZipFile(archive, "w") as zf:
+            for n, image in enumerate(images[:8]):
+                zf.writestr(f"cards/{n}.png", image)
+
+        def call(client):
+            response = client.post("/ocr/bulk?cache=0", data={"images": (BytesIO(archive.getvalue()), "cards.zip")})
+            while response.status_code == 429:
+                time.sleep(0.05)
+                response = client.post("/ocr/bulk?cache=0", data={"images": (BytesIO(archive.getvalue()), "cards.zip")})
+            return response.status_code == 200
+        return "ocr_bulk", "POST /ocr/bulk (ZIP of 8)", cards.app.test_client, call
+
+    return scenarios + [ocr_upload, ocr_upload_cached, ocr_bulk]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--app", choices=["qr", "cards", "all"], default="all")
+    parser.add_argument("--scenario", action="append", help="run only these scenarios (repeatable)")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--attendance", type=int, default=1000000)
+    parser.add_argument("--cards", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=100, help="records per /scan_qr/batch request")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="JSON results path (default bench/results/<timestamp>.json)")
+    args = parser.parse_args()
+
+    output = args.output or os.path.join(ROOT, "bench", "results", f"{datetime.now():%Y%m%d-%H%M%S}.json")
+    output = os.path.abspath(output)
+    results = []
+    notes = []
+    suites = [("qr", qr_scenarios), ("cards", card_scenarios)]
+    for name, build in suites:
+        if args.app not in (name, "all"):
+            continue
+        workdir = tempfile.mkdtemp(prefix=f"bench-{name}-")
+        try:
+            with working_directory(workdir):
+                print(f"Seeding {name} in {workdir} ...", flush=True)
+                for scenario in build(args, workdir, notes):
+                    label, route, setup, call = scenario()
+                    if args.scenario and label not in args.scenario:
+                        continue
+                    print(f"Running {name}/{label} ...", flush=True)
+                    # The apps print debugging output per request; keep it out of the report
+                    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+                        results.append(harness.run(name, label, route, setup, call,
+                                                   requests=args.requests, concurrency=args.concurrency))
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    print()
+    harness.print_table(results)
+    for note in notes:
+        print("note:", note)
+    harness.save(output, results, vars(args), notes)
+    print(f"\nResults written to {output}")
+
+
+if __name__ == "__main__":
+    main()
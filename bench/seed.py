@@ -0,0 +1,168 @@
+"""Fill temporary copies of the two apps' databases with realistic volumes."""
+
+import random
+import sqlite3
+from contextlib import closing
+from datetime import date, timedelta
+
+from werkzeug.security import generate_password_hash
+
+PASSWORD = "bench-password"
+SUBJECTS = [f"Subject {n:02d}" for n in range(1, 41)]
+FIRST_NAMES = ["Ayesha", "Bilal", "Fatima", "Hamza", "Hira", "Imran", "Maryam", "Omar", "Sana", "Usman"]
+LAST_NAMES = ["Ahmed", "Butt", "Chaudhry", "Khan", "Malik", "Qureshi", "Raza", "Sheikh", "Siddiqui", "Zafar"]
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella Labs", "Stark Industries", "Wayne Enterprises"]
+TITLES = ["Software Engineer", "Product Manager", "Sales Director", "Data Scientist", "Consultant"]
+
+
+def bench_email(n):
+    return f"student{n}@bench.test"
+
+
+def seed_attendance(path, users=2000, sessions=2000, attendance=1000000, seed=1, password_method="pbkdf2:sha256"):
+    """Add users, subjects, sessions and attendance to an attendance database.
+
+    The summary triggers are dropped while seeding; the caller recreates
+    them with schema.ensure_schema and backfills with rebuild_summaries.
+    Every user shares PASSWORD, hashed once with password_method. Returns the ids of the new
+    users, the first of which is made an admin, and the new sessions.
+    """
+    rng = random.Random(seed)
+    password_hash = generate_password_hash(PASSWORD, password_method)
+    with closing(sqlite3.connect(path, isolation_level=None)) as conn:
+        for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'").fetchall():
+            conn.execute(f"DROP TRIGGER {name}")
+        conn.execute("BEGIN")
+        first_user = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM users").fetchone()[0]
+        conn.executemany(
+            "INSERT INTO users (username, email, phone_number, hash, department, semester) VALUES (?, ?, ?, ?, ?, ?)",
+            ((f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {n}", bench_email(n), f"0300{n:07d}",
+              password_hash, "General", rng.randint(1, 8)) for n in range(users)),
+        )
+        user_ids = list(range(first_user, first_user + users))
+        conn.execute("INSERT INTO admins (user_id) VALUES (?)", (user_ids[0],))
+
+        conn.execute("INSERT OR IGNORE INTO departments (name) VALUES ('General')")
+        conn.executemany(
+            "INSERT OR IGNORE INTO subjects (name, department_id) VALUES (?, (SELECT id FROM departments WHERE name = 'General'))",
+            ((name,) for name in SUBJECTS),
+        )
+        subject_ids = [row[0] for row in conn.execute(
+            f"SELECT id FROM subjects WHERE name IN ({', '.join(['?'] * len(SUBJECTS))})", SUBJECTS
+        )]
+
+        first_session = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM sessions").fetchone()[0]
+        start = date(2024, 1, 1)
+        session_rows = [
+            ((start + timedelta(days=n % 365)).isoformat(), rng.randint(1, 8), rng.randint(1, 6),
+             rng.choice(subject_ids), rng.choice(("class", "lab")), user_ids[0])
+            for n in range(sessions)
+        ]
+        conn.executemany(
+            "INSERT INTO sessions (date, semester, slot, subject_id, attendance_type, created_by) VALUES (?, ?, ?, ?, ?, ?)",
+            session_rows,
+        )
+        session_ids = list(range(first_session, first_session + sessions))
+
+        # Each session gets a distinct set of attendees, so no student is marked twice
+        per_session = min(max(attendance // max(sessions, 1), 1), users)
+        conn.executemany(
+            "INSERT INTO attendance (user_id, session_id, marked_on) VALUES (?, ?, ?)",
+            ((user_id, session_id, f"{row[0]} {8 + row[2]:02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}")
+             for session_id, row in zip(session_ids, session_rows)
+             for user_id in rng.sample(user_ids, per_session)),
+        )
+        conn.execute("COMMIT")
+    return user_ids, session_ids
+
+
+def seed_cards(path, cards=5000, seed=1):
+    """Create the business_cards table and fill it with cards."""
+    rng = random.Random(seed)
+    with closing(sqlite3.connect(path)) as conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS business_cards (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT,
+                company TEXT,
+                job_title TEXT,
+                card_number INTEGER UNIQUE,
+                email TEXT,
+                phone_number TEXT,
+                address TEXT,
+                website TEXT,
+                raw_text TEXT
+            )
+        """)
+        rows = []
+        for n in range(cards):
+            name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+            company = rng.choice(COMPANIES)
+            title = rng.choice(TITLES)
+            email = f"{name.split()[0].lower()}.{n}@{company.split()[0].lower()}.example"
+            phone = f"+92 300 {rng.randint(1000000, 9999999)}"
+            address = f"{rng.randint(1, 999)} Main Street, Lahore"
+            website = f"www.{company.split()[0].lower()}.example"
+            raw_text = "\n".join([name, title, company, email, phone, address, website])
+            rows.append((name, company, title, 10000000 + n, email, phone, address, website, raw_text))
+        conn.executemany("""
+            INSERT INTO business_cards (name, company, job_title, card_number, email, phone_number, address, website, raw_text)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+        conn.commit()
+
+
+def card_fields(n, seed=1):
+    """The fields printed on synthetic card n, as its card_image renders them."""
+    rng = random.Random(seed + n)
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    company = rng.choice(COMPANIES)
+    return {
+        "name": name,
+        "job_title": rng.choice(TITLES),
+        "company": company,
+        "email": f"{name.split()[0].lower()}@{company.split()[0].lower()}.example",
+        "phone_number": f"+92 300 {rng.randint(1000000, 9999999)}",
+        "address": f"{rng.randint(1, 999)} Main Street, Lahore",
+    }
+
+
+def card_image(n, seed=1, photo=False):
+    """Render a synthetic business card as PNG bytes for OCR uploads.
+
+    With photo=True the card is instead shot like a phone photo: a 12 MP
+    JPEG with the card on a darker table, stored sideways with an EXIF
+    orientation tag.
+    """
+    from io import BytesIO
+
+    from PIL import Image, ImageDraw, ImageFont
+
+    try:
+        font = ImageFont.truetype("DejaVuSans.ttf", 28)
+    except OSError:
+        font = ImageFont.load_default()
+    fields = card_fields(n, seed)
+    lines = [
+        fields["name"],
+        f"Title: {fields['job_title']}",
+        f"Company: {fields['company']}",
+        fields["email"],
+        fields["phone_number"],
+        fields["address"],
+    ]
+    image = Image.new("RGB", (1050, 600), "white")
+    draw = ImageDraw.Draw(image)
+    for i, line in enumerate(lines):
+        draw.text((60, 60 + i * 80), line, fill="black", font=font)
+    if photo:
+        shot = Image.new("RGB", (4000, 3000), (90, 70, 60))
+        shot.paste(image.resize((2100, 1200), Image.LANCZOS), (950, 900))
+        exif = Image.Exif()
+        exif[0x0112] = 6  # stored turned counter-clockwise; viewers turn it back clockwise
+        buffer = BytesIO()
+        shot.rotate(90, expand=True).save(buffer, format="JPEG", quality=90, exif=exif)
+        return buffer.getvalue()
+    buffer = BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
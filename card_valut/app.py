@@ -1,13 +1,25 @@
 import pandas as pd
 from flask import send_file
-from flask import Flask, render_template, request, jsonify, g
-import pytesseract
-from PIL import Image
-import re
+from flask import Flask, render_template, request, jsonify, g, url_for
+from markupsafe import escape
+from werkzeug.http import is_resource_modified
+import atexit
+import base64
+import json
 import os
+import re
 import sqlite3
+import zipfile
+from contextlib import closing
+from datetime import datetime, timezone
+from functools import partial
+from card_ocr import card_from_text, ocr_settings, read_card
+from ocr_cache import OCRCache, cache_key
+from ocr_jobs import OCRJobQueue, QueueFull
+from preprocess import PROFILES
 
 app = Flask(__name__)
+app.config['DATABASE'] = 'cards.db'
 
 @app.route('/save_card', methods=['POST'])
 def save_card():
@@ -59,7 +71,7 @@ def get_db():
     db = getattr(g, '_database', None)
     if db is None:
         # This will create 'cards.db' in the current working directory
-        db = g._database = sqlite3.connect('cards.db')
+        db = g._database = sqlite3.connect(app.config['DATABASE'])
     return db
 
 @app.teardown_appcontext
@@ -82,7 +94,8 @@ def allowed_file(filename):
 def index():
     db = get_db()
     cursor = db.cursor()
-    cursor.execute('SELECT id, name, company, job_title, card_number, email, phone_number, address, website, raw_text FROM business_cards')
+    # The page never shows raw_text, so it isn't fetched
+    cursor.execute('SELECT id, name, company, job_title, card_number, email, phone_number, address, website FROM business_cards')
     cards = cursor.fetchall()
     return render_template('index.html', cards=cards)
 
@@ -100,20 +113,154 @@ def download_excel():
     return send_file(file_path, as_attachment=True)
 
 
-# API: Get all cards (JSON for AJAX)
+# Card listing API: pages of CARDS_PAGE_SIZE cards by default, at most CARDS_PAGE_SIZE_MAX
+app.config['CARDS_PAGE_SIZE'] = 50
+app.config['CARDS_PAGE_SIZE_MAX'] = 500
+
+CARD_COLUMNS = ['id', 'name', 'company', 'job_title', 'card_number', 'email', 'phone_number', 'address', 'website', 'raw_text']
+# Columns /cards can sort on, each with the expression its index is built on
+# (NULLs folded to a value, so a keyset cursor can compare past them)
+SORT_KEYS = {
+    'id': 'id',
+    'name': "IFNULL(name, '')",
+    'company': "IFNULL(company, '')",
+    'card_number': 'IFNULL(card_number, -1)',
+}
+
+
+def encode_cursor(value, card_id):
+    return base64.urlsafe_b64encode(json.dumps([value, card_id]).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Return the (sort value, id) a cursor from encode_cursor holds; raises ValueError if it is malformed."""
+    try:
+        value, card_id = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except Exception:
+        raise ValueError('Invalid cursor')
+    if not isinstance(card_id, int) or not isinstance(value, (int, str)):
+        raise ValueError('Invalid cursor')
+    return value, card_id
+
+
+def cards_version(db):
+    """The listing's version counter and last-modified time, kept up to date by triggers."""
+    version, modified = db.execute('SELECT version, modified FROM cards_meta WHERE id = 1').fetchone()
+    return version, datetime.strptime(modified, '%Y-%m-%d %H:%M:%S').replace(tzinfo=timezone.utc)
+
+
+# API: List cards (JSON for AJAX).
+# ?fields=name,email picks columns (default: all but raw_text), ?sort= one of
+# SORT_KEYS with ?order=asc|desc, ?limit= page size, ?after= the previous page's next cursor.
 @app.route('/cards', methods=['GET'])
 def get_cards():
+    fields = request.args.get('fields')
+    fields = fields.split(',') if fields else [column for column in CARD_COLUMNS if column != 'raw_text']
+    sort = request.args.get('sort', 'id')
+    order = request.args.get('order', 'asc')
+    limit = request.args.get('limit', type=int) or app.config['CARDS_PAGE_SIZE']
+    if any(field not in CARD_COLUMNS for field in fields):
+        return jsonify({'error': f"fields must be among {', '.join(CARD_COLUMNS)}"}), 400
+    if sort not in SORT_KEYS or order not in ('asc', 'desc'):
+        return jsonify({'error': f"sort must be one of {', '.join(SORT_KEYS)} and order asc or desc"}), 400
+    if not 1 <= limit <= app.config['CARDS_PAGE_SIZE_MAX']:
+        return jsonify({'error': f"limit must be between 1 and {app.config['CARDS_PAGE_SIZE_MAX']}"}), 400
+    try:
+        after = decode_cursor(request.args['after']) if request.args.get('after') else None
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # Nothing changed since the client's copy: skip the query altogether
     db = get_db()
-    cursor = db.cursor()
-    cursor.execute('SELECT id, name, company, job_title, card_number, email, phone_number, address, website, raw_text FROM business_cards')
-    cards = cursor.fetchall()
-    card_list = [
-        {
-            'id': c[0], 'name': c[1], 'company': c[2], 'job_title': c[3], 'card_number': c[4],
-            'email': c[5], 'phone_number': c[6], 'address': c[7], 'website': c[8], 'raw_text': c[9]
-        } for c in cards
-    ]
-    return jsonify(card_list)
+    version, modified = cards_version(db)
+    etag = f'cards-{version}'
+    if not is_resource_modified(request.environ, etag=etag, last_modified=modified):
+        response = app.response_class(status=304)
+        response.set_etag(etag)
+        response.last_modified = modified
+        return response
+
+    key = SORT_KEYS[sort]
+    columns = ', '.join(dict.fromkeys(['id', *fields]))
+    # The leading single-column bound lets SQLite seek into the index; the row value breaks ties on id
+    op = '>' if order == 'asc' else '<'
+    keyset = f"WHERE {key} {op}= ? AND ({key}, id) {op} (?, ?)" if after else ''
+    rows = db.execute(f'''
+        SELECT {key} AS sort_key, {columns} FROM business_cards
+        {keyset}
+        ORDER BY {key} {order.upper()}, id {order.upper()}
+        LIMIT ?
+    ''', (*((after[0], *after) if after else ()), limit + 1)).fetchall()
+
+    names = ['sort_key', *dict.fromkeys(['id', *fields])]
+    cards = [dict(zip(names, row)) for row in rows[:limit]]
+    next_cursor = encode_cursor(cards[-1]['sort_key'], cards[-1]['id']) if len(rows) > limit else None
+    for card in cards:
+        del card['sort_key']
+    response = jsonify({'cards': cards, 'next': next_cursor})
+    response.set_etag(etag)
+    response.last_modified = modified
+    return response
+
+# Search results: SEARCH_PAGE_SIZE by default, at most SEARCH_PAGE_SIZE_MAX.
+# bm25 weights per SEARCH_COLUMNS column: a hit in the name counts most, raw OCR text least.
+app.config['SEARCH_PAGE_SIZE'] = 20
+app.config['SEARCH_PAGE_SIZE_MAX'] = 100
+SEARCH_WEIGHTS = (10.0, 5.0, 3.0, 5.0, 1.0)
+# Snippet highlight markers: control characters OCR text won't contain, turned into <mark> after escaping
+SNIPPET_START, SNIPPET_END = '\x02', '\x03'
+
+
+def fts_query(text):
+    """Turn free text into an FTS5 query: every word must match, the last one as a prefix.
+
+    Words are quoted, so FTS5 operators and punctuation typed by the user are
+    taken literally. Returns None when there are no words to search for.
+    """
+    words = re.findall(r'\w+', text)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+# API: Search cards by name, company, job title, email and OCR text: ?q=jo smi&limit=&offset=
+@app.route('/cards/search', methods=['GET'])
+def search_cards():
+    query = fts_query(request.args.get('q', ''))
+    limit = request.args.get('limit', type=int) or app.config['SEARCH_PAGE_SIZE']
+    offset = request.args.get('offset', 0, type=int)
+    if query is None:
+        return jsonify({'error': 'q must contain at least one word'}), 400
+    if not 1 <= limit <= app.config['SEARCH_PAGE_SIZE_MAX'] or offset < 0:
+        return jsonify({'error': f"limit must be between 1 and {app.config['SEARCH_PAGE_SIZE_MAX']} and offset not negative"}), 400
+
+    db = get_db()
+    rows = db.execute(f'''
+        SELECT business_cards.id, business_cards.name, business_cards.company, business_cards.job_title,
+               business_cards.email, business_cards.phone_number,
+               snippet(cards_fts, -1, ?, ?, '…', 12) AS snippet,
+               bm25(cards_fts, {', '.join(map(str, SEARCH_WEIGHTS))}) AS rank
+        FROM cards_fts
+        JOIN business_cards ON business_cards.id = cards_fts.rowid
+        WHERE cards_fts MATCH ?
+        ORDER BY rank
+        LIMIT ? OFFSET ?
+    ''', (SNIPPET_START, SNIPPET_END, query, limit + 1, offset)).fetchall()
+
+    names = ['id', 'name', 'company', 'job_title', 'email', 'phone_number', 'snippet', 'rank']
+    results = []
+    for row in rows[:limit]:
+        result = dict(zip(names, row))
+        # The snippet is card text: escape it, then turn the match markers into HTML
+        result['snippet'] = str(escape(result['snippet'] or '')).replace(SNIPPET_START, '<mark>').replace(SNIPPET_END, '</mark>')
+        results.append(result)
+    return jsonify({
+        'query': query,
+        'results': results,
+        'next_offset': offset + limit if len(rows) > limit else None,
+    })
 
 # API: Get a single card
 @app.route('/cards/<int:card_id>', methods=['GET'])
@@ -155,7 +302,173 @@ def delete_card(card_id):
     db.commit()
     return jsonify({'success': True, 'message': 'Card deleted.'})
 
-# OCR endpoint for image uploads
+def create_cards_table(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS business_cards (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT,
+            company TEXT,
+            job_title TEXT,
+            card_number INTEGER UNIQUE,
+            email TEXT,
+            phone_number TEXT,
+            address TEXT,
+            website TEXT,
+            raw_text TEXT
+        )
+    ''')
+
+
+# Indexes behind /cards' sort orders, and a version row its ETag and
+# Last-Modified come from, bumped by triggers on every change to a card
+CARD_SCHEMA = [
+    "CREATE INDEX IF NOT EXISTS idx_cards_name ON business_cards (IFNULL(name, ''))",
+    "CREATE INDEX IF NOT EXISTS idx_cards_company ON business_cards (IFNULL(company, ''))",
+    'CREATE INDEX IF NOT EXISTS idx_cards_card_number ON business_cards (IFNULL(card_number, -1))',
+    '''CREATE TABLE IF NOT EXISTS cards_meta (
+           id INTEGER PRIMARY KEY CHECK (id = 1),
+           version INTEGER NOT NULL,
+           modified TEXT NOT NULL
+       )''',
+    "INSERT OR IGNORE INTO cards_meta (id, version, modified) VALUES (1, 0, strftime('%Y-%m-%d %H:%M:%S', 'now'))",
+] + [
+    f'''CREATE TRIGGER IF NOT EXISTS trg_cards_version_{event.lower()} AFTER {event} ON business_cards
+       BEGIN
+           UPDATE cards_meta SET version = version + 1, modified = strftime('%Y-%m-%d %H:%M:%S', 'now') WHERE id = 1;
+       END'''
+    for event in ('INSERT', 'UPDATE', 'DELETE')
+]
+
+
+# Full-text index over the searchable columns. It is an external-content
+# table: the text stays in business_cards and triggers keep the index in
+# step. Prefix indexes of 2 and 3 characters make short "jo*" queries cheap.
+SEARCH_COLUMNS = ['name', 'company', 'job_title', 'email', 'raw_text']
+SEARCH_SCHEMA = [
+    f'''CREATE VIRTUAL TABLE IF NOT EXISTS cards_fts USING fts5(
+           {', '.join(SEARCH_COLUMNS)},
+           content='business_cards', content_rowid='id',
+           tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+       )''',
+    f'''CREATE TRIGGER IF NOT EXISTS trg_cards_fts_insert AFTER INSERT ON business_cards
+       BEGIN
+           INSERT INTO cards_fts (rowid, {', '.join(SEARCH_COLUMNS)})
+           VALUES (new.id, {', '.join('new.' + column for column in SEARCH_COLUMNS)});
+       END''',
+    f'''CREATE TRIGGER IF NOT EXISTS trg_cards_fts_delete AFTER DELETE ON business_cards
+       BEGIN
+           INSERT INTO cards_fts (cards_fts, rowid, {', '.join(SEARCH_COLUMNS)})
+           VALUES ('delete', old.id, {', '.join('old.' + column for column in SEARCH_COLUMNS)});
+       END''',
+    f'''CREATE TRIGGER IF NOT EXISTS trg_cards_fts_update AFTER UPDATE ON business_cards
+       BEGIN
+           INSERT INTO cards_fts (cards_fts, rowid, {', '.join(SEARCH_COLUMNS)})
+           VALUES ('delete', old.id, {', '.join('old.' + column for column in SEARCH_COLUMNS)});
+           INSERT INTO cards_fts (rowid, {', '.join(SEARCH_COLUMNS)})
+           VALUES (new.id, {', '.join('new.' + column for column in SEARCH_COLUMNS)});
+       END''',
+]
+
+
+def init_db():
+    """Create the cards table, its indexes, the listing's version triggers and the search index if they are missing."""
+    with closing(sqlite3.connect(app.config['DATABASE'])) as db:
+        cursor = db.cursor()
+        create_cards_table(cursor)
+        for statement in CARD_SCHEMA:
+            cursor.execute(statement)
+        # Cards stored before the search index existed are indexed once, when it is created
+        backfill = cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'cards_fts'").fetchone() is None
+        for statement in SEARCH_SCHEMA:
+            cursor.execute(statement)
+        if backfill:
+            cursor.execute("INSERT INTO cards_fts (cards_fts) VALUES ('rebuild')")
+        db.commit()
+
+
+init_db()
+
+
+def insert_extracted(cursor, extracted_info):
+    """Insert one OCR'd card and return its id; a repeated card_number raises sqlite3.IntegrityError."""
+    cursor.execute('''
+        INSERT INTO business_cards (name, company, job_title, email, phone_number, website, address, card_number, raw_text)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (
+        extracted_info.get('name'),
+        extracted_info.get('company'),
+        extracted_info.get('job_title'),
+        extracted_info.get('email'),
+        extracted_info.get('phone_number'),
+        extracted_info.get('website'),
+        extracted_info.get('address'),
+        extracted_info.get('card_number'),
+        extracted_info.get('raw_text')
+    ))
+    return cursor.lastrowid
+
+
+def save_extracted(extracted_info):
+    """Insert a finished OCR job's card; runs in the job queue's thread, outside any request."""
+    # Try to save to database, but don't break if it fails
+    try:
+        app.logger.debug('Connecting to database...')
+        with closing(sqlite3.connect(app.config['DATABASE'])) as db:
+            cursor = db.cursor()
+            app.logger.debug('Creating table if not exists...')
+            create_cards_table(cursor)
+            app.logger.debug('Inserting data into table...')
+            insert_extracted(cursor, extracted_info)
+            db.commit()
+            app.logger.debug('Data committed to database.')
+    except Exception as db_error:
+        app.logger.error('Database error: %s', db_error)
+        extracted_info['db_error'] = str(db_error)
+    return extracted_info
+
+
+# Preprocessing profile for uploads, one of preprocess.PROFILES ("raw" skips preprocessing)
+app.config['OCR_PROFILE'] = os.environ.get('OCR_PROFILE', 'balanced')
+if app.config['OCR_PROFILE'] not in PROFILES:
+    raise ValueError(f"OCR_PROFILE must be one of {', '.join(PROFILES)}")
+
+# OCR runs in a pool of OCR_WORKERS processes (default: one per core) so
+# tesseract never holds a web worker. At most OCR_MAX_QUEUE uploads may be
+# waiting or running; beyond that /ocr answers 429 and the client retries.
+app.config['OCR_WORKERS'] = int(os.environ.get('OCR_WORKERS', os.cpu_count()))
+app.config['OCR_MAX_QUEUE'] = int(os.environ.get('OCR_MAX_QUEUE', 32))
+app.config['OCR_KEEP_JOBS'] = 1000
+ocr_jobs = OCRJobQueue(
+    partial(read_card, profile=app.config['OCR_PROFILE']),
+    workers=app.config['OCR_WORKERS'],
+    max_queue=app.config['OCR_MAX_QUEUE'],
+    keep=app.config['OCR_KEEP_JOBS'],
+    on_done=save_extracted,
+)
+atexit.register(ocr_jobs.shutdown)
+
+# OCR text is cached by a hash of the image and the OCR settings, so a repeated
+# upload skips tesseract: OCR_CACHE_MEMORY_ITEMS in memory, and up to
+# OCR_CACHE_MAX_BYTES of text in OCR_CACHE_PATH. Send cache=0 to force a fresh read.
+app.config['OCR_CACHE_PATH'] = os.environ.get('OCR_CACHE_PATH', 'ocr_cache.db')
+app.config['OCR_CACHE_MEMORY_ITEMS'] = 256
+app.config['OCR_CACHE_MAX_BYTES'] = 64 * 1024 * 1024
+ocr_cache = OCRCache(
+    app.config['OCR_CACHE_PATH'],
+    memory_items=app.config['OCR_CACHE_MEMORY_ITEMS'],
+    max_bytes=app.config['OCR_CACHE_MAX_BYTES'],
+)
+OCR_SETTINGS = ocr_settings(app.config['OCR_PROFILE'])
+
+
+def remember_text(key):
+    """on_done for an OCR job: cache the text it read, then save the card."""
+    def done(extracted_info):
+        ocr_cache.put(key, extracted_info['raw_text'])
+        return save_extracted(extracted_info)
+    return done
+
+# OCR endpoint for image uploads: queues the image and returns a job to poll
 @app.route('/ocr', methods=['POST'])
 def ocr():
     if 'image' not in request.files:
@@ -166,99 +479,137 @@ def ocr():
     # Check if file is allowed
     if not allowed_file(file.filename):
         return jsonify({'error': 'File type not allowed'}), 400
-    
+
+    image_bytes = file.read()
+    key = cache_key(image_bytes, OCR_SETTINGS)
+    text = None if request.values.get('cache') == '0' else ocr_cache.get(key)
+    if text is not None:
+        # Seen before: answer with the card straight away, saved just as a finished job would be
+        extracted_info = save_extracted(card_from_text(text))
+        return jsonify(dict(extracted_info, cached=True))
+
     try:
-        print('Starting OCR processing...')
-        img = Image.open(file.stream)
-        text = pytesseract.image_to_string(img)
-        print('OCR text extracted:', text)
-
-
-        # Extract information using regex patterns
-        patterns = {
-            'name': r'^[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*$',
-            'company': r'(?i)(?<=Company:)[\w\s]+',
-            'job_title': r'(?i)(?<=Title:)[\w\s]+',
-            'card_number': r'\b\d{8,16}\b',
-            'email': r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}',
-            'phone_number': r'(?:\+\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}',
-            'website': r'(?:http[s]?://)?(?:www\.)?[a-zA-Z0-9-]+(?:\.[a-zA-Z]{2,})+',
-            'address': r'\d+\s+[\w\s.,]+(?:Street|St|Avenue|Ave|Road|Rd|Boulevard|Blvd)[\w\s.,]*',
-        }
-
-        extracted_info = {}
-        lines = text.split('\n')
-
-        # Process each line for different types of information
-        for line in lines:
-            line = line.strip()
-            if line:
-                for key, pattern in patterns.items():
-                    if key not in extracted_info:
-                        match = re.search(pattern, line, re.IGNORECASE)
-                        if match:
-                            extracted_info[key] = match.group(0)
-
-        # If phone_number not found, try to extract from the whole text
-        if not extracted_info.get('phone_number'):
-            phone_matches = re.findall(r'(?:\\+?\\d{1,3}[\\s.-]?)?(?:\\(?\\d{2,4}\\)?[\\s.-]?)?\\d{3,4}[\\s.-]?\\d{3,4}', text)
-            # Filter out matches that are too short or too long
-            phone_matches = [p for p in phone_matches if 7 <= len(re.sub(r'\\D', '', p)) <= 15]
-            if phone_matches:
-                extracted_info['phone_number'] = phone_matches[0]
-
-        # Ensure all required fields for DB insert are present (use None if missing)
-        for field in ['name', 'company', 'job_title', 'card_number', 'email', 'phone_number', 'website', 'address']:
-            if field not in extracted_info:
-                extracted_info[field] = None
-
-        print('Extracted info:', extracted_info)
-        extracted_info['raw_text'] = text
-
-        # Try to save to database, but don't break if it fails
+        job_id = ocr_jobs.submit(image_bytes, on_done=remember_text(key))
+    except QueueFull:
+        return jsonify({'error': 'Too many images are being processed, please try again shortly'}), 429, {'Retry-After': '2'}
+    app.logger.debug('Queued OCR job %s', job_id)
+    return jsonify({'job_id': job_id, 'status': 'queued', 'url': url_for('ocr_job', job_id=job_id)}), 202
+
+# Bulk uploads: at most OCR_BULK_MAX_FILES images per request, each no larger
+# than OCR_BULK_MAX_IMAGE_BYTES once unpacked, with OCR_BULK_WINDOW of them
+# in the OCR pool at a time. MAX_CONTENT_LENGTH caps the request as a whole.
+app.config['MAX_CONTENT_LENGTH'] = 256 * 1024 * 1024
+app.config['OCR_BULK_MAX_FILES'] = 1000
+app.config['OCR_BULK_MAX_IMAGE_BYTES'] = 20 * 1024 * 1024
+app.config['OCR_BULK_WINDOW'] = 2 * app.config['OCR_WORKERS']
+
+
+def bulk_entries(files, report):
+    """Yield (report index, image bytes) for every image among the uploads, ZIP members included.
+
+    ZIP archives are read member by member from the upload itself, never
+    extracted to disk. Entries that aren't images go straight into report as
+    skipped, as is everything past OCR_BULK_MAX_FILES, which is not read.
+    """
+    def entry(name, read, size):
+        report.append({'file': name, 'status': 'skipped'})
+        if len(report) > app.config['OCR_BULK_MAX_FILES']:
+            report[-1]['error'] = 'Too many files'
+        elif not allowed_file(name):
+            report[-1]['error'] = 'File type not allowed'
+        elif size > app.config['OCR_BULK_MAX_IMAGE_BYTES']:
+            report[-1]['error'] = 'Image too large'
+        else:
+            return len(report) - 1, read()
+        return None
+
+    for file in files:
+        if file.filename.lower().endswith('.zip'):
+            try:
+                archive = zipfile.ZipFile(file.stream)
+            except zipfile.BadZipFile:
+                report.append({'file': file.filename, 'status': 'failed', 'error': 'Not a valid ZIP archive'})
+                continue
+            with archive:
+                for info in archive.infolist():
+                    # Folders and macOS resource forks are not cards
+                    if info.is_dir() or info.filename.startswith('__MACOSX/') or os.path.basename(info.filename).startswith('.'):
+                        continue
+                    item = entry(f'{file.filename}/{info.filename}', lambda: archive.read(info), info.file_size)
+                    if item is not None:
+                        yield item
+        else:
+            # A plain upload's size isn't known before reading; MAX_CONTENT_LENGTH bounds it
+            item = entry(file.filename, file.read, 0)
+            if item is not None:
+                yield item
+
+
+def uncached(entries, bypass, keys, cards, report):
+    """Pass on the entries OCR still has to read; cached cards go straight into cards."""
+    for index, image_bytes in entries:
+        key = keys[index] = cache_key(image_bytes, OCR_SETTINGS)
+        text = None if bypass else ocr_cache.get(key)
+        if text is None:
+            yield index, image_bytes
+        else:
+            report[index]['cached'] = True
+            cards.append((index, card_from_text(text)))
+
+
+# Bulk OCR of many images or ZIP archives of them (form field "images", repeatable).
+# Cards are read in parallel, saved in one transaction, and reported file by file.
+@app.route('/ocr/bulk', methods=['POST'])
+def ocr_bulk():
+    files = [file for file in request.files.getlist('images') if file.filename]
+    if not files:
+        return jsonify({'error': 'No images uploaded'}), 400
+
+    report = []
+    cards = []
+    keys = {}
+    entries = uncached(bulk_entries(files, report), request.values.get('cache') == '0', keys, cards, report)
+    try:
+        for index, extracted_info, error in ocr_jobs.imap(entries, app.config['OCR_BULK_WINDOW']):
+            if error is not None:
+                report[index].update(status='failed', error=error)
+            else:
+                ocr_cache.put(keys[index], extracted_info['raw_text'])
+                cards.append((index, extracted_info))
+    except QueueFull:
+        return jsonify({'error': 'Too many images are being processed, please try again shortly'}), 429, {'Retry-After': '2'}
+
+    db = get_db()
+    cursor = db.cursor()
+    create_cards_table(cursor)
+    # A rejected row doesn't abort the transaction, so duplicates are reported and the rest still commit
+    for index, extracted_info in sorted(cards, key=lambda card: card[0]):
         try:
-            print('Connecting to database...')
-            db = get_db()
-            cursor = db.cursor()
-            print('Creating table if not exists...')
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS business_cards (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT,
-                    company TEXT,
-                    job_title TEXT,
-                    card_number INTEGER UNIQUE,
-                    email TEXT,
-                    phone_number TEXT,
-                    address TEXT,
-                    website TEXT,
-                    raw_text TEXT
-                )
-            ''')
-            print('Inserting data into table...')
-            cursor.execute('''
-                INSERT INTO business_cards (name, company, job_title, email, phone_number, website, address, card_number)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                extracted_info.get('name'),
-                extracted_info.get('company'),
-                extracted_info.get('job_title'),
-                extracted_info.get('email'),
-                extracted_info.get('phone_number'),
-                extracted_info.get('website'),
-                extracted_info.get('address'),
-                extracted_info.get('card_number')
-            ))
-            db.commit()
-            print('Data committed to database.')
-        except Exception as db_error:
-            print('Database error:', db_error)
-            extracted_info['db_error'] = str(db_error)
+            card_id = insert_extracted(cursor, extracted_info)
+        except sqlite3.IntegrityError as e:
+            report[index].update(status='duplicate', error=str(e), card=extracted_info)
+        else:
+            report[index].update(status='saved', id=card_id, card=extracted_info)
+    db.commit()
 
-        return jsonify(extracted_info)
-    except Exception as e:
-        print('General error:', e)
-        return jsonify({'error': str(e)}), 500
+    counts = {}
+    for result in report:
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+    app.logger.debug('Bulk OCR: %s', counts)
+    return jsonify({'counts': counts, 'files': report})
+
+# Status of a queued OCR job; once done, result holds the extracted fields
+@app.route('/ocr/jobs/<job_id>', methods=['GET'])
+def ocr_job(job_id):
+    job = ocr_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job)
+
+# OCR pool load (pending jobs against the queue limit, and totals) and cache hit rates
+@app.route('/ocr/stats', methods=['GET'])
+def ocr_stats():
+    return jsonify(dict(ocr_jobs.stats(), cache=ocr_cache.stats()))
 
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,36 @@
+from io import BytesIO
+
+import pytesseract
+from PIL import Image
+
+from extractor import extract_fields
+from preprocess import PROFILES, preprocess, tesseract_config
+
+
+def read_card(image_bytes, profile='balanced'):
+    """OCR one card image and return its extracted fields plus the raw text.
+
+    profile names the preprocessing steps and tesseract flags, one of
+    preprocess.PROFILES. Runs in an OCR worker process, so it takes and
+    returns plain data.
+    """
+    settings = PROFILES[profile]
+    img = preprocess(Image.open(BytesIO(image_bytes)), settings)
+    text = pytesseract.image_to_string(img, config=tesseract_config(settings))
+    return card_from_text(text)
+
+
+def card_from_text(text):
+    """Extracted fields plus the raw text, as read_card returns them."""
+    extracted_info = extract_fields(text)
+    extracted_info['raw_text'] = text
+    return extracted_info
+
+
+def ocr_settings(profile):
+    """Everything besides the image that decides what OCR reads, for cache keys."""
+    try:
+        version = str(pytesseract.get_tesseract_version())
+    except Exception:
+        version = None
+    return {'profile': PROFILES[profile], 'tesseract': version}
@@ -0,0 +1,73 @@
+"""Card fields from OCR text.
+
+Each field has a pattern, tried line by line until it first matches, and a
+cheap check on the line that must pass before the pattern is worth running
+(an email needs an "@", a card number a digit, and so on). The checks only
+skip lines a pattern could never match, so results are exactly those of
+searching every line with every pattern.
+"""
+
+import re
+
+FIELDS = ['name', 'company', 'job_title', 'card_number', 'email', 'phone_number', 'website', 'address']
+
+_DIGIT = re.compile(r'\d')
+
+# (field, pattern, check) in the order fields are tried on a line; check
+# gets the line, its lowercase form and whether it has a digit
+_RULES = [
+    ('name', re.compile(r'^[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*$', re.IGNORECASE),
+     lambda line, lower, digit: line[0].isalpha() and not digit),
+    ('company', re.compile(r'(?i)(?<=Company:)[\w\s]+', re.IGNORECASE),
+     lambda line, lower, digit: 'company:' in lower),
+    ('job_title', re.compile(r'(?i)(?<=Title:)[\w\s]+', re.IGNORECASE),
+     lambda line, lower, digit: 'title:' in lower),
+    ('card_number', re.compile(r'\b\d{8,16}\b', re.IGNORECASE),
+     lambda line, lower, digit: digit),
+    ('email', re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', re.IGNORECASE),
+     lambda line, lower, digit: '@' in line),
+    ('phone_number', re.compile(r'(?:\+\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}', re.IGNORECASE),
+     lambda line, lower, digit: digit),
+    ('website', re.compile(r'(?:http[s]?://)?(?:www\.)?[a-zA-Z0-9-]+(?:\.[a-zA-Z]{2,})+', re.IGNORECASE),
+     lambda line, lower, digit: '.' in line),
+    ('address', re.compile(r'\d+\s+[\w\s.,]+(?:Street|St|Avenue|Ave|Road|Rd|Boulevard|Blvd)[\w\s.,]*', re.IGNORECASE),
+     lambda line, lower, digit: digit),
+]
+
+# Phone numbers in looser layouts, looked for across the whole text when no line matched
+_PHONE_FALLBACK = re.compile(r'(?:\+?\d{1,3}[\s.-]?)?(?:\(?\d{2,4}\)?[\s.-]?)?\d{3,4}[\s.-]?\d{3,4}')
+_NON_DIGIT = re.compile(r'\D')
+
+
+def extract_fields(text):
+    """Pick the card fields out of OCR text; fields that aren't found are None."""
+    extracted_info = dict.fromkeys(FIELDS)
+    remaining = list(_RULES)
+    for line in text.split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+        lower = line.lower()
+        digit = _DIGIT.search(line) is not None
+        for rule in list(remaining):
+            field, pattern, check = rule
+            if check(line, lower, digit):
+                match = pattern.search(line)
+                if match:
+                    extracted_info[field] = match.group(0)
+                    remaining.remove(rule)
+        if not remaining:
+            break
+
+    if extracted_info['phone_number'] is None:
+        for candidate in _PHONE_FALLBACK.findall(text):
+            # Too few or too many digits to be a phone number
+            if 7 <= len(_NON_DIGIT.sub('', candidate)) <= 15:
+                extracted_info['phone_number'] = candidate
+                break
+    return extracted_info
+
+
+def extract_many(texts):
+    """extract_fields over many texts, e.g. to re-extract stored cards after a pattern change."""
+    return [extract_fields(text) for text in texts]
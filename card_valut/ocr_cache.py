@@ -0,0 +1,112 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def cache_key(image_bytes, settings):
+    """SHA-256 of the image bytes and the OCR settings that read them."""
+    digest = hashlib.sha256(json.dumps(settings, sort_keys=True).encode())
+    digest.update(image_bytes)
+    return digest.hexdigest()
+
+
+class OCRCache:
+    """OCR text by cache_key, in an in-memory LRU in front of a SQLite file.
+
+    The cache holds tesseract's raw text rather than extracted fields, so
+    a change to field extraction applies to cached cards too. The memory
+    tier keeps memory_items entries; the file is trimmed, least recently
+    used first, to max_bytes of text.
+    """
+
+    def __init__(self, path, memory_items=256, max_bytes=64 * 1024 * 1024):
+        self.path = path
+        self.memory_items = memory_items
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode = WAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS ocr_cache (
+                key TEXT PRIMARY KEY,
+                text TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_ocr_cache_last_used ON ocr_cache (last_used)')
+        self._bytes = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM ocr_cache').fetchone()[0]
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Return the cached text for key, or None."""
+        with self._lock:
+            text = self._memory.get(key)
+            if text is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return text
+            row = self._conn.execute('SELECT text FROM ocr_cache WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute('UPDATE ocr_cache SET last_used = ? WHERE key = ?', (time.time(), key))
+            self.disk_hits += 1
+            self._remember(key, row[0])
+            return row[0]
+
+    def put(self, key, text):
+        with self._lock:
+            self._remember(key, text)
+            size = len(text.encode())
+            previous = self._conn.execute('SELECT size FROM ocr_cache WHERE key = ?', (key,)).fetchone()
+            self._conn.execute(
+                'INSERT OR REPLACE INTO ocr_cache (key, text, size, last_used) VALUES (?, ?, ?, ?)',
+                (key, text, size, time.time()),
+            )
+            self._bytes += size - (previous[0] if previous else 0)
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def _remember(self, key, text):
+        self._memory[key] = text
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def _evict(self):
+        # Drop least recently used rows until the file is back under 90% of its budget
+        target = self.max_bytes * 0.9
+        rows = self._conn.execute('SELECT key, size FROM ocr_cache ORDER BY last_used').fetchall()
+        stale = []
+        for key, size in rows:
+            if self._bytes <= target:
+                break
+            stale.append((key,))
+            self._bytes -= size
+        self._conn.execute('BEGIN')
+        self._conn.executemany('DELETE FROM ocr_cache WHERE key = ?', stale)
+        self._conn.execute('COMMIT')
+        self.evictions += len(stale)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': round((self.memory_hits + self.disk_hits) / lookups, 3) if lookups else None,
+                'memory_entries': len(self._memory),
+                'disk_entries': self._conn.execute('SELECT COUNT(*) FROM ocr_cache').fetchone()[0],
+                'disk_bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'evictions': self.evictions,
+            }
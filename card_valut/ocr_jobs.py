@@ -0,0 +1,188 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+
+class QueueFull(Exception):
+    """Raised when max_queue jobs are already waiting or running."""
+
+
+def _call(function, *args):
+    # Some exceptions (pytesseract's among them) can't be unpickled in the
+    # parent, which breaks the whole pool; send back only their message
+    try:
+        return function(*args)
+    except Exception as e:
+        raise RuntimeError(str(e) or e.__class__.__name__) from None
+
+
+class OCRJobQueue:
+    """OCR jobs run in a bounded process pool and looked up later by id.
+
+    submit() returns straight away with a job id; at most max_queue jobs
+    may be queued or running at once, beyond which it raises QueueFull.
+    When a job finishes, on_done(result) runs in the parent process and its
+    return value becomes the job's result. The newest keep finished jobs
+    are remembered for polling.
+    """
+
+    def __init__(self, function, workers=None, max_queue=32, keep=1000, on_done=None):
+        self.function = function
+        self.workers = workers
+        self.max_queue = max_queue
+        self.keep = keep
+        self.on_done = on_done
+        self._lock = threading.Lock()
+        self._pool = None
+        self._broken = False
+        self._jobs = OrderedDict()
+        self.pending = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def _ensure_pool(self):
+        # Called with the lock held. A worker that died (e.g. killed for
+        # memory) leaves the pool unusable, so a new one is started.
+        if self._pool is None or self._broken:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False)
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            self._broken = False
+
+    def submit(self, *args, on_done=None):
+        """Queue function(*args) and return the new job's id; on_done replaces the queue's own for this job."""
+        with self._lock:
+            if self.pending >= self.max_queue:
+                self.rejected += 1
+                raise QueueFull()
+            self._ensure_pool()
+            self.pending += 1
+            self.submitted += 1
+            job_id = uuid.uuid4().hex
+            job = self._jobs[job_id] = {'id': job_id, 'submitted': time.time(), 'result': None, 'error': None}
+            future = job['future'] = self._pool.submit(_call, self.function, *args)
+        # Outside the lock: the callback runs here if the job has already finished
+        future.add_done_callback(lambda future: self._finish(job, future, on_done or self.on_done))
+        return job_id
+
+    def _finish(self, job, future, on_done):
+        try:
+            result = future.result()
+            if on_done is not None:
+                result = on_done(result)
+            job['result'] = result
+        except BrokenProcessPool as e:
+            self._broken = True
+            job['error'] = str(e)
+        except Exception as e:
+            job['error'] = str(e) or e.__class__.__name__
+        with self._lock:
+            self.pending -= 1
+            if job['error'] is None:
+                self.completed += 1
+            else:
+                self.failed += 1
+            job['finished'] = time.time()
+            self._forget_finished()
+
+    def imap(self, items, window):
+        """Run function over (key, arg) pairs in the pool and yield (key, result, error) in order.
+
+        items is consumed lazily and at most window of them are in flight, so
+        a large upload never sits in memory all at once. Runs in the calling
+        thread, which waits on the pool; on_done is not applied. Each item
+        counts against max_queue like a submit(): while the queue is full the
+        next item waits for one of this call's own to finish, and QueueFull
+        is raised if none of them are in flight.
+        """
+        in_flight = deque()
+        items = iter(items)
+        item = None
+        try:
+            while True:
+                while len(in_flight) < window:
+                    if item is None:
+                        item = next(items, None)
+                        if item is None:
+                            break
+                    with self._lock:
+                        if self.pending >= self.max_queue:
+                            if in_flight:
+                                break
+                            self.rejected += 1
+                            raise QueueFull()
+                        self._ensure_pool()
+                        self.pending += 1
+                        self.submitted += 1
+                        in_flight.append((item[0], self._pool.submit(_call, self.function, item[1])))
+                    item = None
+                if not in_flight:
+                    return
+                key, future = in_flight.popleft()
+                try:
+                    result, error = future.result(), None
+                except BrokenProcessPool as e:
+                    self._broken = True
+                    result, error = None, str(e)
+                except Exception as e:
+                    result, error = None, str(e) or e.__class__.__name__
+                with self._lock:
+                    self.pending -= 1
+                    if error is None:
+                        self.completed += 1
+                    else:
+                        self.failed += 1
+                yield key, result, error
+        finally:
+            # The caller stopped early: drop what it will never collect
+            for key, future in in_flight:
+                future.cancel()
+                with self._lock:
+                    self.pending -= 1
+
+    def _forget_finished(self):
+        finished = [job_id for job_id, job in self._jobs.items() if 'finished' in job]
+        for job_id in finished[:max(0, len(finished) - self.keep)]:
+            del self._jobs[job_id]
+
+    def get(self, job_id):
+        """Return a job's status and, once it has finished, its result or error; None if unknown."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if 'finished' in job:
+                status = 'failed' if job['error'] is not None else 'done'
+            elif job['future'].running():
+                status = 'running'
+            else:
+                status = 'queued'
+            return {
+                'id': job_id,
+                'status': status,
+                'result': job['result'],
+                'error': job['error'],
+                'submitted': job['submitted'],
+                'finished': job.get('finished'),
+            }
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'pending': self.pending,
+                'max_queue': self.max_queue,
+                'submitted': self.submitted,
+                'completed': self.completed,
+                'failed': self.failed,
+                'rejected': self.rejected,
+            }
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,98 @@
+from PIL import Image, ImageChops, ImageOps
+
+# A business card is 3.5 x 2 inches; its long side sets the scale for a target DPI
+CARD_INCHES = 3.5
+
+# Preprocessing profiles: which steps run before OCR and the tesseract flags
+# each is read with. "raw" is the original behaviour, the full image straight
+# into tesseract's defaults. psm 11 (sparse text) suits a card's scattered
+# lines; oem 1 is the LSTM engine alone.
+PROFILES = {
+    'raw': {'orient': False, 'dpi': None, 'grayscale': False, 'autocrop': False, 'binarize': False, 'psm': 3, 'oem': 3},
+    'fast': {'orient': True, 'dpi': 200, 'grayscale': True, 'autocrop': True, 'binarize': False, 'psm': 11, 'oem': 1},
+    'balanced': {'orient': True, 'dpi': 300, 'grayscale': True, 'autocrop': True, 'binarize': True, 'psm': 11, 'oem': 1},
+    'accurate': {'orient': True, 'dpi': 400, 'grayscale': True, 'autocrop': True, 'binarize': True, 'psm': 3, 'oem': 1},
+}
+
+
+def otsu_threshold(gray):
+    """Return the gray level that best splits a grayscale image's histogram into two classes."""
+    histogram = gray.histogram()
+    total = sum(histogram)
+    weighted_total = sum(level * count for level, count in enumerate(histogram))
+    background = weighted = 0
+    best_level, best_variance = 127, -1.0
+    for level, count in enumerate(histogram):
+        background += count
+        if background == 0:
+            continue
+        foreground = total - background
+        if foreground == 0:
+            break
+        weighted += level * count
+        mean_background = weighted / background
+        mean_foreground = (weighted_total - weighted) / foreground
+        variance = background * foreground * (mean_background - mean_foreground) ** 2
+        if variance > best_variance:
+            best_level, best_variance = level, variance
+    return best_level
+
+
+def autocrop(img, tolerance=32, margin=0.02, probe=512):
+    """Crop to whatever differs from the background, taken as the corner pixels' median colour.
+
+    The box is found on a copy reduced to about probe pixels across, so a
+    full-size photo is only touched by the crop itself.
+    """
+    factor = max(1, max(img.size) // probe)
+    gray = img.reduce(factor) if factor > 1 else img
+    gray = gray if gray.mode == 'L' else gray.convert('L')
+    width, height = gray.size
+    corners = sorted(gray.getpixel(point) for point in [(0, 0), (width - 1, 0), (0, height - 1), (width - 1, height - 1)])
+    background = Image.new('L', gray.size, (corners[1] + corners[2]) // 2)
+    mask = ImageChops.difference(gray, background).point(lambda value: 255 if value > tolerance else 0)
+    box = mask.getbbox()
+    if box is None:
+        return img
+    pad_x, pad_y = int(width * margin), int(height * margin)
+    left, top, right, bottom = box
+    box = (max(0, left - pad_x), max(0, top - pad_y), min(width, right + pad_x), min(height, bottom + pad_y))
+    # A crop that keeps almost everything isn't worth the copy
+    if (box[2] - box[0]) * (box[3] - box[1]) > 0.95 * width * height:
+        return img
+    return img.crop(tuple(min(edge * factor, limit) for edge, limit in zip(box, img.size * 2)))
+
+
+def preprocess(img, profile):
+    """Apply a profile's steps to a freshly opened PIL image and return the image to OCR."""
+    if profile['dpi'] and img.format == 'JPEG':
+        # Let the JPEG decoder skip straight to a smaller size, keeping enough
+        # pixels for a card that fills at least half the photo
+        scale = 2 * profile['dpi'] * CARD_INCHES / max(img.size)
+        img.draft('L' if profile['grayscale'] else 'RGB', (round(img.width * scale), round(img.height * scale)))
+    if profile['orient']:
+        img = ImageOps.exif_transpose(img)
+    if profile['grayscale']:
+        img = img.convert('L')
+    if profile['autocrop']:
+        img = autocrop(img)
+    if profile['dpi']:
+        img = downscale(img, profile['dpi'] * CARD_INCHES)
+    if profile['binarize']:
+        gray = img if img.mode == 'L' else img.convert('L')
+        threshold = otsu_threshold(gray)
+        img = gray.point(lambda value: 255 if value > threshold else 0, mode='1')
+    return img
+
+
+def downscale(img, long_side):
+    """Shrink img so its longer side is at most long_side pixels; never enlarges."""
+    scale = long_side / max(img.size)
+    if scale >= 1:
+        return img
+    # reducing_gap shrinks by whole factors first, then resamples the rest with Lanczos
+    return img.resize((max(1, round(img.width * scale)), max(1, round(img.height * scale))), Image.LANCZOS, reducing_gap=3.0)
+
+
+def tesseract_config(profile):
+    return f"--oem {profile['oem']} --psm {profile['psm']}"
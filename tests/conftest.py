@@ -0,0 +1,41 @@
+import importlib.util
+import os
+import shutil
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+QR_DIR = os.path.join(ROOT, "QR-ATTENDANCE-SYSTEM")
+CARD_DIR = os.path.join(ROOT, "card_valut")
+BENCH_DIR = os.path.join(ROOT, "bench")
+
+for path in (QR_DIR, CARD_DIR, BENCH_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+@pytest.fixture(scope="session")
+def qr(tmp_path_factory):
+    """The attendance app module, loaded against a small seeded copy of its database."""
+    import seed
+
+    workdir = tmp_path_factory.mktemp("qr")
+    shutil.copy(os.path.join(QR_DIR, "class-attendance.db"), workdir)
+    # The app opens its database by relative path
+    previous = os.getcwd()
+    os.chdir(workdir)
+    try:
+        spec = importlib.util.spec_from_file_location("qr_app", os.path.join(QR_DIR, "app.py"))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules["qr_app"] = module
+        spec.loader.exec_module(module)
+        seed.seed_attendance("class-attendance.db", users=200, sessions=200, attendance=5000,
+                             password_method="pbkdf2:sha256:1")
+        schema = sys.modules["schema"]
+        schema.ensure_schema(module.db)
+        schema.rebuild_summaries(module.db)
+        module.subject_catalog.invalidate()
+        yield module
+    finally:
+        os.chdir(previous)
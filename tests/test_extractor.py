@@ -0,0 +1,17 @@
+import extract
+import extractor
+
+
+def test_extractor_matches_the_original_loop():
+    # The golden corpus bench/extract.py times, edge cases included
+    texts = extract.corpus(2000, 1)
+    mismatches = [
+        text for text in texts
+        if extractor.extract_fields(text) != extract.baseline_extract_fields(text)
+    ]
+    assert mismatches == []
+
+
+def test_extract_many_matches_extract_fields():
+    texts = extract.corpus(200, 2)
+    assert extractor.extract_many(texts) == [extractor.extract_fields(text) for text in texts]
@@ -0,0 +1,24 @@
+import pytest
+
+import query_plans
+
+HOT_QUERIES = [
+    "export",
+    "admin attendance",
+    "admin attendance (next page)",
+    "admin sessions",
+    "admin sessions (next page)",
+    "scan lookup",
+    "subject attendance",
+]
+
+
+def test_every_hot_query_is_checked(qr):
+    assert sorted(qr.hot_queries()) == sorted(HOT_QUERIES)
+
+
+@pytest.mark.parametrize("name", HOT_QUERIES)
+def test_hot_query_uses_an_index(qr, name):
+    sql, args = qr.hot_queries()[name]
+    plan = query_plans.explain(qr.db, sql, *args)
+    assert query_plans.problems(plan) == [], plan
@@ -0,0 +1,32 @@
+import pytest
+
+CASES = [
+    ("2024-03-05T09:15:00", "2024-03-05 09:15:00"),
+    ("2024-03-05 09:15:00", "2024-03-05 09:15:00"),
+    ("2024-03-05T09:15:00Z", "2024-03-05 09:15:00"),
+    ("2024-03-05T09:15:00z", "2024-03-05 09:15:00"),
+    ("2024-03-05T09:15:00.250Z", "2024-03-05 09:15:00"),
+    ("2024-03-05T14:15:00+05:00", "2024-03-05 09:15:00"),
+    ("2024-03-05T01:15:00-08:00", "2024-03-05 09:15:00"),
+    ("2024-03-06T00:30:00+05:30", "2024-03-05 19:00:00"),
+]
+
+
+@pytest.mark.parametrize("value, expected", CASES)
+def test_scanned_at_is_stored_as_utc(qr, value, expected):
+    assert qr.parse_scanned_at(value) == expected
+
+
+@pytest.mark.parametrize("value", ["", "Z", "yesterday", "2024-13-01T00:00:00Z", None, 1709630100])
+def test_invalid_scanned_at_is_rejected(qr, value):
+    with pytest.raises((TypeError, ValueError)):
+        qr.parse_scanned_at(value)
+
+
+def test_batch_scan_reports_invalid_scanned_at(qr):
+    client = qr.app.test_client()
+    with client.session_transaction() as session:
+        session["user_id"] = qr.db.execute("SELECT user_id FROM admins LIMIT 1")[0]["user_id"]
+    response = client.post("/scan_qr/batch", json=[{"user_id": 1, "qr_data": "a,b,c,d,e", "scanned_at": "not a time"}])
+    assert response.status_code == 200
+    assert response.get_json()["results"][0]["error"] == "Invalid scanned_at timestamp."